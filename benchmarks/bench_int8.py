@@ -0,0 +1,91 @@
+# benchmarks/bench_int8.py
+"""
+float32 vs. dynamic int8 XTTS on CPU: speed and objective similarity.
+
+For a fixed sentence set (same seed per sentence for both models) this prints
+real-time factor for each model, plus two similarity scores of the int8 audio
+against the float32 reference after DTW alignment of their MFCCs:
+  - MCD (mel cepstral distortion, dB; lower is closer, < ~6 dB is usually
+    hard to tell apart for the same voice)
+  - cosine similarity of aligned log-mel frames (1.0 = identical)
+
+Run from the project root:
+    python -m benchmarks.bench_int8
+"""
+from __future__ import annotations
+
+import statistics
+import time
+
+import numpy as np
+
+from scripts.text_to_speech import MODEL_PATH, SPEAKER_WAV, XTTSEngine, load_tts
+
+SENTENCES = (
+    "The old lighthouse keeper climbed the spiral stairs every night.",
+    "Nobody in the village remembered a time before the lamp.",
+    "When the storm came, the ships turned toward the light and found the harbor.",
+    "She opened the letter slowly, afraid of what it might say.",
+    "In the morning, the sea was calm and the sky was the color of pearls.",
+)
+LANGUAGE = "en"
+SEED = 1234
+
+
+def synth_all(engine: XTTSEngine):
+    import torch
+
+    engine.synthesize("Warm up.", SPEAKER_WAV, LANGUAGE)
+    waves, rtfs = [], []
+    for text in SENTENCES:
+        torch.manual_seed(SEED)  # same sampling path for both models
+        start = time.perf_counter()
+        wav = engine.synthesize(text, SPEAKER_WAV, LANGUAGE)
+        elapsed = time.perf_counter() - start
+        waves.append(wav)
+        rtfs.append(elapsed / max(len(wav) / engine.sample_rate, 1e-6))
+    return waves, rtfs
+
+
+def similarity(ref: np.ndarray, test: np.ndarray, sr: int):
+    """(MCD dB, log-mel cosine) of `test` against `ref` along a DTW path."""
+    import librosa
+
+    mel_ref = np.log(librosa.feature.melspectrogram(y=ref, sr=sr, n_mels=80) + 1e-6)
+    mel_test = np.log(librosa.feature.melspectrogram(y=test, sr=sr, n_mels=80) + 1e-6)
+    mfcc_ref = librosa.feature.mfcc(S=mel_ref, n_mfcc=25)[1:]  # drop c0 (energy)
+    mfcc_test = librosa.feature.mfcc(S=mel_test, n_mfcc=25)[1:]
+    _, path = librosa.sequence.dtw(X=mfcc_ref, Y=mfcc_test, metric="euclidean")
+    i, j = path[:, 0], path[:, 1]
+
+    diff = mfcc_ref[:, i] - mfcc_test[:, j]
+    mcd = (10.0 / np.log(10.0)) * np.sqrt(2.0) * float(np.mean(np.sqrt(np.sum(diff**2, axis=0))))
+    a, b = mel_ref[:, i], mel_test[:, j]
+    cos = np.sum(a * b, axis=0) / (np.linalg.norm(a, axis=0) * np.linalg.norm(b, axis=0) + 1e-9)
+    return mcd, float(np.mean(cos))
+
+
+def main() -> None:
+    f32 = XTTSEngine(load_tts(MODEL_PATH, gpu=False, quantize=False), MODEL_PATH)
+    ref_waves, ref_rtfs = synth_all(f32)
+    sr = f32.sample_rate
+    del f32
+
+    int8 = XTTSEngine(load_tts(MODEL_PATH, gpu=False, quantize=True), MODEL_PATH)
+    q_waves, q_rtfs = synth_all(int8)
+
+    print(f"\n{'#':>2} {'RTF f32':>8} {'RTF int8':>9} {'MCD dB':>7} {'cos':>6}")
+    mcds, coss = [], []
+    for k, (ref, test) in enumerate(zip(ref_waves, q_waves)):
+        mcd, cos = similarity(ref, test, sr)
+        mcds.append(mcd)
+        coss.append(cos)
+        print(f"{k:>2} {ref_rtfs[k]:>8.2f} {q_rtfs[k]:>9.2f} {mcd:>7.2f} {cos:>6.3f}")
+
+    f, q = statistics.mean(ref_rtfs), statistics.mean(q_rtfs)
+    print(f"\nmean RTF: f32 {f:.2f}, int8 {q:.2f} (speedup ×{f / max(q, 1e-9):.2f})")
+    print(f"mean MCD {statistics.mean(mcds):.2f} dB, mean log-mel cosine {statistics.mean(coss):.3f}")
+
+
+if __name__ == "__main__":
+    main()
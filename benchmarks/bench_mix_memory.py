@@ -0,0 +1,110 @@
+# benchmarks/bench_mix_memory.py
+"""
+Peak memory of the streaming mixer vs. narration length.
+
+Writes a synthetic narration WAV (speech-like bursts with pauses, 24 kHz mono
+like XTTS output) and a short music loop, then mixes them with
+mix_audio(streaming=True) in a child process, once for a short file and once
+for a multi-hour one, with looping, ducking and loudness normalization on.
+The child's peak RSS must stay under RSS_CAP_MB and must not grow with the
+audio length; the script exits non-zero otherwise.
+
+Needs ffmpeg on PATH and a few GB of free space in the temp directory.
+Run from the project root:
+    python -m benchmarks.bench_mix_memory [hours]
+"""
+from __future__ import annotations
+
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+NARRATION_SR = 24000
+MUSIC_SECONDS = 90
+SHORT_HOURS = 0.1
+LONG_HOURS = 3.0
+RSS_CAP_MB = 400
+RSS_GROWTH_MB = 32  # allowed difference between the short and the long run
+
+
+def write_narration(path: Path, hours: float, block_s: float = 60.0) -> None:
+    """Block-written so generating hours of audio doesn't need the memory under test."""
+    rng = np.random.default_rng(0)
+    block = int(block_s * NARRATION_SR)
+    total = int(hours * 3600 * NARRATION_SR)
+    t = np.arange(block) / NARRATION_SR
+    # ~3 s of "speech" then ~1 s of pause, amplitude-modulated noise + tone
+    envelope = ((t % 4.0) < 3.0) * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    with sf.SoundFile(str(path), "w", NARRATION_SR, 1, subtype="PCM_16") as f:
+        written = 0
+        while written < total:
+            n = min(block, total - written)
+            voice = 0.3 * np.sin(2 * np.pi * 180 * t[:n]) + 0.05 * rng.standard_normal(n)
+            f.write((voice * envelope[:n]).astype(np.float32))
+            written += n
+
+
+def write_music(path: Path, sample_rate: int = 48000) -> None:
+    t = np.arange(MUSIC_SECONDS * sample_rate) / sample_rate
+    left = 0.2 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 330 * t)
+    right = 0.2 * np.sin(2 * np.pi * 277 * t) + 0.1 * np.sin(2 * np.pi * 415 * t)
+    sf.write(str(path), np.stack([left, right], axis=1).astype(np.float32), sample_rate, subtype="PCM_16")
+
+
+def child(narration: str, music: str, out: str) -> None:
+    from scripts.mix_audio import mix_audio
+
+    mix_audio(
+        Path(narration), Path(music), Path(out),
+        strategy="loop", use_library=False, duck=True, normalize=True, streaming=True,
+    )
+
+
+def measure(tmp: Path, hours: float, music: Path) -> tuple:
+    """(peak RSS MB, wall seconds) of one streaming mix in a fresh process."""
+    narration = tmp / f"narration_{hours:g}h.wav"
+    print(f"⏳ writing {hours:g} h of synthetic narration...")
+    write_narration(narration, hours)
+    out = tmp / "mix.wav"
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_mix_memory", "--child", str(narration), str(music), str(out)],
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    # ru_maxrss of reaped children is the largest single process (kB on Linux).
+    rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    narration.unlink()
+    out.unlink()
+    return rss_mb, wall
+
+
+def main() -> int:
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else LONG_HOURS
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        music = tmp / "music.wav"
+        write_music(music)
+        short_rss, short_wall = measure(tmp, SHORT_HOURS, music)
+        long_rss, long_wall = measure(tmp, hours, music)  # RUSAGE_CHILDREN is a running max
+
+    print(f"\n{'hours':>6} {'peak RSS MB':>12} {'wall s':>8} {'× realtime':>11}")
+    for h, rss, wall in ((SHORT_HOURS, short_rss, short_wall), (hours, long_rss, long_wall)):
+        print(f"{h:>6g} {rss:>12.1f} {wall:>8.1f} {h * 3600 / max(wall, 1e-9):>11.0f}")
+
+    ok = long_rss <= RSS_CAP_MB and long_rss - short_rss <= RSS_GROWTH_MB
+    print(f"\n{'✅' if ok else '❌'} cap {RSS_CAP_MB} MB, allowed growth {RSS_GROWTH_MB} MB")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        child(*sys.argv[2:])
+    else:
+        sys.exit(main())
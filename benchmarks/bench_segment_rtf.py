@@ -0,0 +1,69 @@
+# benchmarks/bench_segment_rtf.py
+"""
+Real-time factor vs. segment length for XTTS on CPU.
+
+Synthesizes prefixes of a fixed passage at several character lengths and
+prints mean RTF (synth time / audio time; lower is faster) per length, which
+is what MAX/TARGET_SEGMENT_CHARS in scripts/text_segments.py are tuned from.
+
+Run from the project root:
+    python -m benchmarks.bench_segment_rtf
+"""
+from __future__ import annotations
+
+import statistics
+import time
+
+from scripts.text_segments import split_long
+from scripts.text_to_speech import SPEAKER_WAV, XTTSEngine, load_tts
+
+PASSAGE = (
+    "The old lighthouse keeper climbed the spiral stairs every night, counting each step aloud. "
+    "He had done so for forty years, and the sea had always answered him with the same low roar. "
+    "When the lamp finally went dark, the ships came home without it, guided only by the stars, "
+    "and the keeper sat by the window listening to a silence he had never heard before. "
+    "In the morning the village gathered at the harbor, unsure whether to mourn or to celebrate."
+)
+LENGTHS = (20, 40, 80, 120, 160, 200, 250, 320, 400)
+REPEATS = 3
+LANGUAGE = "en"
+
+
+def text_of_length(n: int) -> str:
+    """Passage prefix of about n chars, cut at a word boundary."""
+    cut = PASSAGE[:n]
+    return cut.rsplit(" ", 1)[0] if len(PASSAGE) > n and " " in cut else cut
+
+
+def main() -> None:
+    engine = XTTSEngine(load_tts(gpu=False))
+    engine.synthesize("Warm up.", SPEAKER_WAV, LANGUAGE)  # conditioning + first-call overhead
+
+    print(f"{'chars':>6} {'audio_s':>8} {'synth_s':>8} {'RTF':>6} {'RTF sd':>7}")
+    for n in LENGTHS:
+        text = text_of_length(n)
+        rtfs, audio, synth = [], [], []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            wav = engine.synthesize(text, SPEAKER_WAV, LANGUAGE)
+            elapsed = time.perf_counter() - start
+            dur = len(wav) / engine.sample_rate
+            rtfs.append(elapsed / max(dur, 1e-6))
+            audio.append(dur)
+            synth.append(elapsed)
+        sd = statistics.stdev(rtfs) if len(rtfs) > 1 else 0.0
+        print(
+            f"{len(text):>6} {statistics.mean(audio):>8.2f} {statistics.mean(synth):>8.2f} "
+            f"{statistics.mean(rtfs):>6.2f} {sd:>7.2f}"
+        )
+
+    # The same passage as the segmenter would feed it, for an end-to-end comparison.
+    pieces = split_long(PASSAGE)
+    start = time.perf_counter()
+    total = sum(len(engine.synthesize(p, SPEAKER_WAV, LANGUAGE)) for p in pieces) / engine.sample_rate
+    elapsed = time.perf_counter() - start
+    print(f"\nsegmented passage: {len(pieces)} pieces, RTF {elapsed / max(total, 1e-6):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_stream_mix_parity.py
+"""
+Streamed mix (MixConsumer, as with STREAM_MIX) vs. the batch mix (run()).
+
+Both mix the same synthetic narration (24 kHz mono, like XTTS output) into
+the same music loop with the module defaults. The batch path decodes the
+narration with ffmpeg (`-ac 2 -ar 48000`); the streamed path is fed the raw
+mono samples in TTS-sized pieces and upmixes/resamples them itself. The two
+resamplers differ, so the check is on level, not on bits: narration alone
+(music muted) must come out at the same level on both paths, and the full
+mixes must differ by no more than RESIDUAL_MAX_DB below the mix. Exits
+non-zero otherwise.
+
+Needs ffmpeg on PATH. Run from the project root:
+    python -m benchmarks.bench_stream_mix_parity
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.bench_mix_memory import write_music, write_narration
+
+NARRATION_MINUTES = 1.0
+PIECE_S = 0.4  # size of the streamed TTS pieces
+LEVEL_TOL_DB = 0.1
+RESIDUAL_MAX_DB = -30.0
+EDGE_S = 0.1  # resampler edge effects at either end are not compared
+
+
+def db(x: np.ndarray) -> float:
+    return 20 * np.log10(max(float(np.sqrt(np.mean(np.square(x, dtype=np.float64)))), 1e-12))
+
+
+def batch_mix(narration: Path, music: Path, out: Path, **kwargs) -> np.ndarray:
+    from scripts.mix_audio import mix_audio
+
+    mix_audio(narration, music, out, use_library=False, **kwargs)
+    return sf.read(str(out), dtype="float32")[0]
+
+
+def streamed_mix(narration: Path, music: Path, out: Path, **kwargs) -> np.ndarray:
+    from scripts.audio_stream import AudioChunk
+    from scripts.mix_audio import mix_consumer
+
+    mono, sr = sf.read(str(narration), dtype="float32")
+    consumer = mix_consumer(bg_path=music, out_path=out, use_library=False, **kwargs)
+    step = int(PIECE_S * sr)
+    for k in range(0, len(mono), step):
+        consumer.feed(AudioChunk(k // step, mono[k : k + step], sr))
+    consumer.close()
+    return sf.read(str(out), dtype="float32")[0]
+
+
+def trimmed(a: np.ndarray, b: np.ndarray, edge: int):
+    n = min(len(a), len(b))
+    return a[edge : n - edge], b[edge : n - edge]
+
+
+def main() -> int:
+    from scripts.mix_audio import SAMPLE_RATE
+
+    edge = int(EDGE_S * SAMPLE_RATE)
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        narration, music = tmp / "narration.wav", tmp / "music.wav"
+        write_narration(narration, NARRATION_MINUTES / 60)
+        write_music(music)
+
+        batch, stream = trimmed(
+            batch_mix(narration, music, tmp / "batch.wav"),
+            streamed_mix(narration, music, tmp / "stream.wav"),
+            edge,
+        )
+        batch_voice, stream_voice = trimmed(
+            batch_mix(narration, music, tmp / "batch_voice.wav", bg_volume=0.0),
+            streamed_mix(narration, music, tmp / "stream_voice.wav", bg_volume=0.0),
+            edge,
+        )
+
+    level_diff = db(stream_voice) - db(batch_voice)
+    residual = db(stream - batch) - db(batch)
+    print(f"narration level: batch {db(batch_voice):.2f} dB, streamed {db(stream_voice):.2f} dB (Δ {level_diff:+.2f} dB)")
+    print(f"mix residual: {residual:.1f} dB relative to the batch mix")
+
+    ok = abs(level_diff) <= LEVEL_TOL_DB and residual <= RESIDUAL_MAX_DB
+    print(f"\n{'✅' if ok else '❌'} level within ±{LEVEL_TOL_DB} dB, residual ≤ {RESIDUAL_MAX_DB} dB")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# benchmarks/bench_subtitle_timing.py
+"""
+Speed and word-timing error of the subtitle timing engines.
+
+Synthetic mode builds a narration with known word boundaries: every word is
+a voiced burst (tone + noise under an attack/decay envelope), words are
+separated by short low-level gaps and sentences by longer pauses, and the
+sentence spans are handed over exactly as the TTS timing manifest would.
+Word durations are drawn per letter (vowels longer than consonants) under a
+random per-word tempo, not from the syllable estimator approx/syllables
+weights by. Letter-level draws still lean towards approx/chars, so the
+chars/syllables ranking here is indicative only; narration mode below is
+the real check. Engines:
+
+    even        equal share per word, no snapping (baseline)
+    approx/*    scripts/approx_timing.py, weighted by chars or syllables
+    whisperx    wav2vec2 forced alignment, when whisperx and the checkpoint
+                under models/ are available
+
+The bursts are not speech, so on synthetic audio the whisperx row measures
+speed and rough behaviour only. Narration mode scores the approx engines on
+real TTS output (its timing manifest gives the sentence spans) against
+whisperx word timings as the reference; it needs whisperx.
+
+When whisperx is unavailable its row is reported as NOT MEASURED: the
+comparison against whisperx is then missing, not implied.
+
+Run from the project root:
+    python -m benchmarks.bench_subtitle_timing [minutes]
+    python -m benchmarks.bench_subtitle_timing --narration assets/audio/generated/output.wav
+"""
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from scripts.align_segments import ALIGN_SAMPLE_RATE, merge_words, segment_jobs
+from scripts.approx_timing import approx_words
+
+SR = ALIGN_SAMPLE_RATE
+MINUTES = 10.0
+VOWEL_S = (0.06, 0.11)  # per-letter duration ranges for the synthetic "speech"
+CONSONANT_S = (0.035, 0.075)
+TEMPO_SIGMA = 0.2  # lognormal per-word tempo spread
+WORD_GAP_S = (0.02, 0.12)
+SENTENCE_PAUSE_S = 0.45
+WORDS = (
+    "the old lighthouse keeper climbed spiral stairs every night counting each step aloud "
+    "he had done so for forty years and sea always answered him with same low roar when "
+    "lamp finally went dark ships came home without it guided only by stars window listening "
+    "to silence never heard before morning village gathered at harbor unsure whether mourn "
+    "or celebrate extraordinary"
+).split()
+
+
+def letter_durations(word: str, rng: np.random.Generator) -> float:
+    """Spoken length of `word`: a random duration per letter, vowels longer."""
+    return float(sum(rng.uniform(*(VOWEL_S if c in "aeiou" else CONSONANT_S)) for c in word))
+
+
+def synth_corpus(minutes: float, seed: int = 0) -> Tuple[np.ndarray, List[dict], List[dict]]:
+    """(wav, sentence segments, true words) for about `minutes` of narration."""
+    rng = np.random.default_rng(seed)
+    pieces: List[np.ndarray] = []
+    segments: List[dict] = []
+    truth: List[dict] = []
+    t = 0.0
+
+    def emit(samples: np.ndarray) -> None:
+        nonlocal t
+        pieces.append(samples.astype(np.float32))
+        t += len(samples) / SR
+
+    emit(0.002 * rng.standard_normal(int(0.3 * SR)))
+    while t < minutes * 60:
+        tokens = list(rng.choice(WORDS, size=int(rng.integers(5, 18))))
+        seg_start = t
+        for k, word in enumerate(tokens):
+            if k:
+                emit(0.003 * rng.standard_normal(int(rng.uniform(*WORD_GAP_S) * SR)))
+            dur = letter_durations(word, rng) * rng.lognormal(0.0, TEMPO_SIGMA)
+            n = int(dur * SR)
+            x = np.arange(n) / SR
+            env = np.minimum(1.0, np.minimum(x / 0.02, (dur - x) / 0.04)) * (0.6 + 0.4 * np.sin(2 * np.pi * 5 * x))
+            voice = 0.3 * np.sin(2 * np.pi * rng.uniform(110, 220) * x) + 0.08 * rng.standard_normal(n)
+            truth.append({"word": word, "start": t, "end": t + n / SR})
+            emit(voice * env)
+        segments.append({"start": seg_start, "end": t, "text": " ".join(tokens)})
+        emit(0.002 * rng.standard_normal(int(SENTENCE_PAUSE_S * SR)))
+    return np.concatenate(pieces), segments, truth
+
+
+def errors_ms(words: List[dict], truth: List[dict]) -> np.ndarray:
+    """|start| and |end| errors in ms per word (a missing timing counts as 10 s off)."""
+    out = []
+    for w, ref in zip(words, truth):
+        if ref.get("start") is None or ref.get("end") is None:
+            continue  # reference has no timing for this word (whisperx can leave gaps)
+        for k in ("start", "end"):
+            out.append(abs((w[k] if w.get(k) is not None else ref["start"] + 10.0) - ref[k]) * 1000)
+    return np.asarray(out)
+
+
+def even(wav, segments):
+    return approx_words(wav, SR, segments, weight="chars", snap_window_s=0.0)
+
+
+def whisperx_engine() -> Callable:
+    from scripts.subtitles import WhisperXAligner
+
+    aligner = WhisperXAligner()  # raises if whisperx or the checkpoint is missing
+
+    def run(wav, segments):
+        return merge_words(aligner.align_batch(segment_jobs(wav, SR, segments)))
+
+    return run
+
+
+def narration_corpus(audio_path: str) -> Tuple[np.ndarray, List[dict]]:
+    """(wav, sentence segments) of real TTS output, spans from its timing manifest."""
+    from scripts.align_segments import load_align_audio
+    from scripts.audio_manifest import manifest_segments_s, read_manifest
+
+    manifest = read_manifest(audio_path)
+    if manifest is None:
+        raise SystemExit(f"No valid timing manifest next to {audio_path}; regenerate the narration.")
+    return load_align_audio(audio_path), manifest_segments_s(manifest)
+
+
+def report(name: str, run: Callable, wav: np.ndarray, segments: List[dict], truth: List[dict]) -> List[dict]:
+    audio_s = len(wav) / SR
+    start = time.perf_counter()
+    words = run(wav, segments)
+    elapsed = time.perf_counter() - start
+    err = errors_ms(words, truth)
+    print(
+        f"{name:>17} {elapsed:>8.3f} {audio_s / max(elapsed, 1e-9):>11.0f} {err.mean():>8.1f} "
+        f"{statistics.median(err):>7.1f} {np.percentile(err, 95):>7.1f} {(err <= 100).mean():>8.1%}"
+    )
+    return words
+
+
+def main() -> None:
+    narration = sys.argv[2] if len(sys.argv) > 2 and sys.argv[1] == "--narration" else None
+    engines = [
+        ("even", even),
+        ("approx/chars", lambda w, s: approx_words(w, SR, s, weight="chars")),
+        ("approx/syllables", lambda w, s: approx_words(w, SR, s, weight="syllables")),
+    ]
+    try:
+        load_start = time.perf_counter()
+        whisperx = whisperx_engine()
+        print(f"whisperx model load: {time.perf_counter() - load_start:.1f}s (not counted below)\n")
+    except (ImportError, FileNotFoundError) as e:
+        whisperx = None
+        print(f"whisperx: NOT MEASURED ({e}) — the comparison against whisperx is missing.\n")
+
+    header = f"{'engine':>17} {'time_s':>8} {'x realtime':>11} {'mean_ms':>8} {'median':>7} {'p95':>7} {'<=100ms':>8}"
+    if narration:
+        if whisperx is None:
+            raise SystemExit("Narration mode scores against whisperx timings; install whisperx and the checkpoint.")
+        wav, segments = narration_corpus(narration)
+        print(f"narration: {len(wav) / SR / 60:.1f} min, {len(segments)} segments (reference: whisperx)\n")
+        print(header)
+        start = time.perf_counter()
+        truth = whisperx(wav, segments)
+        elapsed = time.perf_counter() - start
+        print(f"{'whisperx':>17} {elapsed:>8.3f} {len(wav) / SR / max(elapsed, 1e-9):>11.0f} {'(reference)':>8}")
+        for name, run in engines:
+            report(name, run, wav, segments, truth)
+        return
+
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else MINUTES
+    wav, segments, truth = synth_corpus(minutes)
+    print(f"corpus: {len(wav) / SR / 60:.1f} min, {len(segments)} sentences, {len(truth)} words\n")
+    print(header)
+    for name, run in engines + ([("whisperx", whisperx)] if whisperx else []):
+        report(name, run, wav, segments, truth)
+    if whisperx is None:
+        print(f"{'whisperx':>17} {'NOT MEASURED':>12}")
+
+
+if __name__ == "__main__":
+    main()
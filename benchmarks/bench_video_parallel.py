@@ -0,0 +1,86 @@
+# benchmarks/bench_video_parallel.py
+"""
+Segment-parallel slideshow rendering: wall time vs. number of workers.
+
+Builds a synthetic slideshow (random-texture stills + a silent WAV of
+DURATION_S), plans it with the real timeline code, and renders it through
+scripts.video_parallel.render_parallel with 1, 2, 4, … workers up to the
+CPU count, printing wall time, output fps and speedup over one worker.
+An untimed render first warms the cover-image cache, so every timed run
+reads the same cached slides (otherwise the 1-worker baseline alone would
+pay the decodes and inflate every speedup). Each output is checked with
+ffprobe for timestamp jumps at the segment joins; the script exits non-zero
+if any are found.
+
+Needs ffmpeg and ffprobe on PATH. Run from the project root:
+    python -m benchmarks.bench_video_parallel [duration_s]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+from PIL import Image
+
+from scripts.build_video import SlideshowParams, plan_timeline
+from scripts.video_parallel import check_timestamps, render_parallel
+
+DURATION_S = 60.0
+N_IMAGES = 16
+IMAGE_SIZE = (1024, 1792)  # what the image generator produces (w, h)
+
+
+def make_inputs(tmp: Path, duration_s: float):
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(N_IMAGES):
+        # Low-frequency noise upscaled: photo-like content for the encoder
+        small = (rng.random((IMAGE_SIZE[1] // 32, IMAGE_SIZE[0] // 32, 3)) * 255).astype(np.uint8)
+        path = tmp / f"img_{i:02d}.png"
+        Image.fromarray(small).resize(IMAGE_SIZE, Image.BICUBIC).save(path)
+        images.append(path)
+    audio = tmp / "silence.wav"
+    sf.write(str(audio), np.zeros((int(duration_s * 48000), 2), dtype=np.float32), 48000)
+    return images, audio
+
+
+def main() -> int:
+    duration_s = float(sys.argv[1]) if len(sys.argv) > 1 else DURATION_S
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, *[2**k for k in range(1, 6) if 2**k <= cpus], cpus})
+    params = SlideshowParams()
+
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        images, audio = make_inputs(tmp, duration_s)
+        timeline = plan_timeline(images, duration_s, params)
+
+        print("⏳ warm-up render (cover-image cache), not timed")
+        render_parallel(timeline, audio, tmp / "warmup.mp4", params, counts[-1])
+
+        rows = []
+        for workers in counts:
+            out = tmp / f"out_{workers}.mp4"
+            start = time.perf_counter()
+            render_parallel(timeline, audio, out, params, workers)
+            rows.append((workers, time.perf_counter() - start, check_timestamps(out, timeline.fps)))
+
+    base = rows[0][1]
+    print(f"\n{timeline.frame_count} frames ({duration_s:g}s @ {timeline.fps} fps, {len(timeline.slides)} slides)")
+    print(f"{'workers':>8} {'wall s':>8} {'fps':>7} {'speedup':>8} {'joins':>6}")
+    for workers, wall, problems in rows:
+        joins = "ok" if not problems else f"{len(problems)} bad"
+        print(f"{workers:>8} {wall:>8.1f} {timeline.frame_count / wall:>7.1f} {base / wall:>8.2f} {joins:>6}")
+    for workers, _, problems in rows:
+        for problem in problems[:5]:
+            print(f"   ❌ {workers} workers: {problem}")
+    return 1 if any(problems for _, _, problems in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
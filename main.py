@@ -1,24 +1,51 @@
-# from scripts.subtitles import generate_subtitles
+# from scripts.subtitles import TIMING_ENGINE, generate_subtitles
+from scripts.align_stream import AlignConsumer
 from scripts.text_to_speech import generate_audio_from_json
 from scripts.get_info import get_speach
 from scripts.get_images import get_images
-from scripts.build_video import build_video
-from scripts.subtitles import generate_subtitles
+from scripts.build_video import OUTPUT_PATH, SUBTITLED_OUTPUT_PATH, build_video, profile_output_path
+from scripts.subtitles import TIMING_ENGINE, generate_subtitles
+from scripts.align_stream import AlignConsumer
 from scripts.burner import burn_subtitles
-from scripts.mix_audio import run
+from scripts.mix_audio import OUT_PATH, mix_consumer, run
 
+STREAM_MIX = False  # True = mix (and align) narration block by block while TTS streams
+SINGLE_ENCODE = True  # True = burn subtitles during build_video; False = separate burn pass
+RENDER_PROFILE = "final"  # "draft" = fast low-res preview with identical timing (assets/video/draft)
 
-print("📝 Generating audio...")
-generate_audio_from_json()
 
-print("📝 Mixing Audios...")
-mixed_path = run()
+def main():
+    # Streamed alignment fills the timing cache that generate_subtitles(stream=True) reads.
+    align_while_streaming = STREAM_MIX and TIMING_ENGINE == "whisperx"
+    if STREAM_MIX:
+        print("📝 Generating + mixing audio...")
+        consumers = [mix_consumer()] + ([AlignConsumer()] if align_while_streaming else [])
+        generate_audio_from_json(stream=True, consumers=consumers)
+        mixed_path = OUT_PATH
+    else:
+        print("📝 Generating audio...")
+        generate_audio_from_json()
 
-print("📝 Building video...")
-build_video()
+        print("📝 Mixing Audios...")
+        mixed_path = run()
 
-print("📝 Generating subtitle...")
-ass_file = generate_subtitles()
+    # Subtitles only need the narration, so they are ready before the video encode.
+    print("📝 Generating subtitle...")
+    ass_file = generate_subtitles(stream=True) if align_while_streaming else generate_subtitles()
 
-print("📝 Burning subtitle...")
-burn_subtitles("assets/video/output.mp4", ass_file, "assets/video/output_sub.mp4")
+    video_path = profile_output_path(OUTPUT_PATH, RENDER_PROFILE)
+    subtitled_path = profile_output_path(SUBTITLED_OUTPUT_PATH, RENDER_PROFILE)
+    if SINGLE_ENCODE:
+        print("📝 Building video (subtitles burned in the same encode)...")
+        build_video(out_path=subtitled_path, subtitles=ass_file, profile=RENDER_PROFILE)
+    else:
+        print("📝 Building video...")
+        build_video(out_path=video_path, profile=RENDER_PROFILE)
+
+        print("📝 Burning subtitle...")
+        burn_subtitles(video_path, ass_file, subtitled_path, draft=(RENDER_PROFILE == "draft"))
+
+
+# Guarded: the TTS/alignment/video process pools use "spawn", which re-imports this module.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# scripts/align_parallel.py
+"""
+Process-pool sentence alignment.
+
+Sentence jobs (scripts/align_segments.py) are independent, so they shard
+across worker processes that each keep one WhisperXAligner resident with an
+explicit torch thread budget. Word timings come back per job, in story
+order, ready for merge_words().
+
+Workers are spawned, so they re-import the entry module: call align_parallel
+from behind an `if __name__ == "__main__":` guard, as main.py does.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
+
+from scripts.tts_parallel import spawn_thread_env
+
+# ===== Defaults (edit per machine) =====
+ALIGN_PROCESSES = 1  # 1 = align sentences in-process (or on the align worker)
+TORCH_THREADS_PER_WORKER = 2
+
+_aligner = None  # one resident model per worker process
+
+
+def _init_worker(language: str, threads: int) -> None:
+    # OMP/MKL/OpenBLAS limits come from the environment the parent spawned us with.
+    import torch
+
+    torch.set_num_threads(threads)
+
+    from scripts.subtitles import WhisperXAligner
+
+    global _aligner
+    _aligner = WhisperXAligner(language=language)
+
+
+def _run_job(job):
+    job.words = _aligner.align(job.audio, job.segments)
+    return job
+
+
+def align_parallel(
+    jobs: Sequence,
+    language: str = "en",
+    processes: int = ALIGN_PROCESSES,
+    threads_per_worker: int = TORCH_THREADS_PER_WORKER,
+) -> List:
+    """Align AlignJobs on `processes` workers; returns them in input order with words filled."""
+    processes = max(1, min(processes, len(jobs)))
+    print(f"🧵 Aligning {len(jobs)} sentences on {processes} processes × {threads_per_worker} torch threads")
+    start = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")  # torch state must not be forked
+    with spawn_thread_env(threads_per_worker), ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(language, threads_per_worker),
+    ) as pool:
+        done = list(pool.map(_run_job, jobs, chunksize=max(1, len(jobs) // (processes * 4))))
+    print(f"   ⏱️ wall: {time.perf_counter() - start:.1f}s (incl. model loads)")
+    return done
@@ -0,0 +1,141 @@
+# scripts/align_segments.py
+"""
+Sentence-level segmentation for forced alignment.
+
+CTC alignment cost and memory grow with segment length, and one bad region
+derails every word after it, so the narration is aligned one sentence at a
+time. Sentence spans come from the TTS timing manifest when it is valid;
+otherwise the story text is split into sentences and matched to silent gaps
+found with a vectorized RMS pass over the waveform (each boundary goes to
+the gap nearest where its character offset predicts it; sentences with no
+usable gap are merged with their neighbour).
+
+Each span becomes its own AlignJob on a slice of the audio, so jobs are
+independent (see scripts/align_parallel.py) and their word times are shifted
+back by the slice offset when merged.
+"""
+from __future__ import annotations
+
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from scripts.cache_utils import PathLike
+
+ALIGN_SAMPLE_RATE = 16000  # wav2vec2 input rate (whisperx.audio.SAMPLE_RATE)
+
+# ===== Silence detection defaults =====
+RMS_HOP_S = 0.02  # one RMS value per 20 ms
+SILENCE_DB = -40.0  # quieter than this, relative to the loudest frame, is silence
+MIN_SILENCE_S = 0.2  # shorter dips are treated as within-sentence pauses
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def load_align_audio(audio_path: PathLike) -> np.ndarray:
+    """Mono float32 at ALIGN_SAMPLE_RATE (what whisperx.load_audio returns)."""
+    from scripts.audio_io import decode_audio
+
+    return decode_audio(audio_path, ALIGN_SAMPLE_RATE, channels=1)[:, 0]
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def frame_rms(wav: np.ndarray, sr: int, hop_s: float = RMS_HOP_S) -> np.ndarray:
+    """RMS per non-overlapping hop (the tail shorter than one hop is dropped)."""
+    hop = max(1, int(round(hop_s * sr)))
+    n = len(wav) // hop
+    frames = np.asarray(wav[: n * hop], dtype=np.float32).reshape(n, hop)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / hop)
+
+
+def detect_silences(
+    wav: np.ndarray,
+    sr: int,
+    silence_db: float = SILENCE_DB,
+    min_silence_s: float = MIN_SILENCE_S,
+    hop_s: float = RMS_HOP_S,
+) -> List[Tuple[float, float]]:
+    """(start_s, end_s) of every run of quiet frames at least min_silence_s long."""
+    rms = frame_rms(wav, sr, hop_s)
+    if not len(rms) or rms.max() <= 0:
+        return []
+    quiet = 20 * np.log10(np.maximum(rms, 1e-10) / rms.max()) < silence_db
+    edges = np.diff(np.concatenate(([0], quiet.astype(np.int8), [0])))
+    starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    hop = max(1, int(round(hop_s * sr))) / sr
+    return [
+        (float(a * hop), float(b * hop))
+        for a, b in zip(starts, stops)
+        if (b - a) * hop >= min_silence_s
+    ]
+
+
+def sentence_segments(wav: np.ndarray, sr: int, text: str) -> List[dict]:
+    """Sentence spans {'start', 'end', 'text'} (seconds) placed on silent gaps of `wav`."""
+    duration = len(wav) / float(sr)
+    sentences = split_sentences(text)
+    if len(sentences) <= 1:
+        return [{"start": 0.0, "end": duration, "text": text}]
+
+    silences = detect_silences(wav, sr)
+    # Speech runs from the end of leading silence to the start of trailing silence.
+    lead = next((b for a, b in silences if a <= 0.0), 0.0)
+    tail = next((a for a, b in silences if b >= duration - RMS_HOP_S), duration)
+    gaps = [(a, b) for a, b in silences if lead < a and b < tail]
+
+    chars = np.cumsum([len(s) for s in sentences], dtype=np.float64)
+    segments: List[dict] = []
+    start, pending, used = 0.0, [], -1
+    for i, sentence in enumerate(sentences):
+        pending.append(sentence)
+        if i == len(sentences) - 1:
+            break
+        target = lead + (tail - lead) * chars[i] / chars[-1]
+        # Nearest unused gap after the previous boundary, within half a sentence.
+        window = 0.5 * (tail - lead) * len(sentence) / chars[-1]
+        best = min(
+            (k for k in range(used + 1, len(gaps)) if abs(sum(gaps[k]) / 2 - target) <= window),
+            key=lambda k: abs(sum(gaps[k]) / 2 - target),
+            default=None,
+        )
+        if best is None:
+            continue  # no pause where this sentence should end: merge with the next
+        used = best
+        segments.append({"start": start, "end": gaps[best][0], "text": " ".join(pending)})
+        start, pending = gaps[best][1], []
+    segments.append({"start": start, "end": duration, "text": " ".join(pending)})
+    return segments
+
+
+def segment_jobs(wav: np.ndarray, sr: int, segments: Sequence[dict]):
+    """One AlignJob per segment on its own slice of `wav`, timed from the slice start."""
+    from scripts.subtitles import AlignJob
+
+    jobs = []
+    for i, seg in enumerate(segments):
+        a = max(0, int(round(seg["start"] * sr)))
+        b = min(len(wav), int(round(seg["end"] * sr)))
+        if b <= a or not seg["text"].strip():
+            continue
+        piece = np.ascontiguousarray(wav[a:b], dtype=np.float32)
+        jobs.append(
+            AlignJob(piece, [{"start": 0.0, "end": (b - a) / sr, "text": seg["text"]}], f"sentence {i + 1}", a / sr)
+        )
+    return jobs
+
+
+def merge_words(jobs: Sequence) -> List[dict]:
+    """Concatenate the jobs' word timings on the full-audio clock."""
+    words: List[dict] = []
+    for job in jobs:
+        for w in job.words:
+            w = dict(w)
+            for k in ("start", "end"):
+                if w.get(k) is not None:
+                    w[k] = float(w[k]) + job.offset
+            words.append(w)
+    return words
@@ -0,0 +1,236 @@
+# scripts/align_stream.py
+"""
+Streaming windowed alignment for long narration.
+
+The sentence path (scripts/align_segments.py) decodes the whole narration
+first, which for multi-hour audio is gigabytes before the model even runs.
+Here audio is decoded block by block and only the current window is kept:
+
+    manifest:  each TTS segment is aligned as soon as its audio has been
+               read, then everything before its end is released
+    otherwise: windows of STREAM_WINDOW_S overlap by STREAM_OVERLAP_S; a
+               text cursor hands each window the next words (sized from
+               the average speaking rate, with slack). Words ending inside
+               the overlap are left for the next window, which starts at
+               the last committed word, so extra text squeezed into a
+               window's tail is never emitted.
+
+Word timings are yielded per window, ready for subtitles.AssWriter, so
+peak memory is one window of audio plus its emission matrix.
+
+AlignConsumer does the manifest variant during streamed TTS instead: each
+segment is aligned as soon as its last chunk arrives, and on close the words
+go to the timing cache under the key word_timings(stream=True) looks up, so
+generate_subtitles(stream=True) never reads output.wav back to align it.
+"""
+from __future__ import annotations
+
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from scripts.align_segments import ALIGN_SAMPLE_RATE
+from scripts.audio_stream import AudioChunk
+from scripts.cache_utils import PathLike
+
+STREAM_WINDOW_S = 30.0  # audio per alignment call
+STREAM_OVERLAP_S = 5.0  # tail re-aligned by the next window
+STREAM_TEXT_SLACK = 1.3  # text handed to a window, relative to the average speaking rate
+STREAM_BLOCK_S = 5.0  # decode granularity
+
+
+class _AudioWindow:
+    """Mono float32 at `sr`, decoded on demand and released from the front."""
+
+    def __init__(self, audio_path: PathLike, sr: int = ALIGN_SAMPLE_RATE, block_s: float = STREAM_BLOCK_S):
+        from scripts.audio_io import stream_audio
+
+        self.sr = sr
+        self.base = 0  # sample index of buf[0] in the whole file
+        self.buf = np.zeros(0, dtype=np.float32)
+        self._blocks = stream_audio(audio_path, sr, channels=1, block_frames=int(block_s * sr))
+        self.eof = False
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.buf)
+
+    def slice(self, a: int, b: int) -> np.ndarray:
+        """Samples [a, b) (clipped at end of file); a must not be released yet."""
+        parts = [self.buf]
+        end = self.end
+        while end < b and not self.eof:
+            block = next(self._blocks, None)
+            if block is None:
+                self.eof = True
+                break
+            parts.append(block[:, 0])
+            end += len(block)
+        if len(parts) > 1:
+            self.buf = np.concatenate(parts)
+        return self.buf[a - self.base : b - self.base]
+
+    def release(self, sample: int) -> None:
+        """Forget everything before `sample`."""
+        drop = min(sample, self.end) - self.base
+        if drop > 0:
+            self.buf = self.buf[drop:].copy()
+            self.base += drop
+
+
+def _shifted(words: List[dict], offset: float) -> List[dict]:
+    return [
+        dict(w, **{k: float(w[k]) + offset for k in ("start", "end") if w.get(k) is not None})
+        for w in words
+    ]
+
+
+def _stream_segments(aligner, audio: _AudioWindow, segments: List[dict]) -> Iterator[List[dict]]:
+    sr = audio.sr
+    for seg in segments:
+        a, b = int(round(seg["start"] * sr)), int(round(seg["end"] * sr))
+        piece = audio.slice(a, b)
+        if len(piece) and seg["text"].strip():
+            span = [{"start": 0.0, "end": len(piece) / sr, "text": seg["text"]}]
+            yield _shifted(aligner.align(piece, span), a / sr)
+        audio.release(b)
+
+
+def _stream_windows(
+    aligner, audio: _AudioWindow, text: str, duration: float, window_s: float, overlap_s: float
+) -> Iterator[List[dict]]:
+    sr = audio.sr
+    tokens = text.split()
+    chars_per_s = max(1, len(text)) / max(duration, 1e-6)
+    cursor, t0 = 0, 0.0
+    while cursor < len(tokens):
+        t1 = min(duration, t0 + window_s)
+        last = t1 >= duration - 1e-6
+        n = len(tokens) - cursor
+        if not last:
+            budget, n = (t1 - t0) * chars_per_s * STREAM_TEXT_SLACK, 0
+            while cursor + n < len(tokens) and (n == 0 or budget > 0):
+                budget -= len(tokens[cursor + n]) + 1
+                n += 1
+
+        a, b = int(round(t0 * sr)), int(round(t1 * sr))
+        piece = audio.slice(a, b)
+        span = [{"start": 0.0, "end": len(piece) / sr, "text": " ".join(tokens[cursor : cursor + n])}]
+        words = aligner.align(piece, span)
+
+        if last:
+            keep = len(words)
+        else:
+            # Commit words that end before the overlap; at least one, so the cursor moves.
+            limit = t1 - t0 - overlap_s
+            ends = [w.get("end") for w in words]
+            keep = max([i + 1 for i, e in enumerate(ends) if e is not None and e <= limit], default=1)
+        committed = _shifted(words[:keep], t0)
+        yield committed
+
+        cursor += keep
+        if last:
+            break
+        ends = [w["end"] for w in committed if w.get("end") is not None]
+        t0 = max(t0 + 1.0 / sr, ends[-1]) if ends else t1 - overlap_s
+        audio.release(int(t0 * sr))
+
+
+def stream_word_timings(
+    audio_path: PathLike,
+    text: str,
+    aligner,
+    window_s: float = STREAM_WINDOW_S,
+    overlap_s: float = STREAM_OVERLAP_S,
+) -> Iterator[List[dict]]:
+    """Yield aligned words window by window without loading the whole narration."""
+    import soundfile as sf
+
+    from scripts.audio_manifest import manifest_segments_s, read_manifest
+
+    audio = _AudioWindow(audio_path)
+    manifest = read_manifest(audio_path)
+    if manifest is not None:
+        yield from _stream_segments(aligner, audio, manifest_segments_s(manifest))
+    else:
+        duration = sf.info(str(audio_path)).duration
+        yield from _stream_windows(aligner, audio, text, duration, window_s, overlap_s)
+
+
+class AlignConsumer:
+    """
+    AudioConsumer (scripts/audio_stream.py) that aligns streamed TTS segment
+    by segment, with the same spans and text as _stream_segments reads from
+    the manifest. Words are cached on close, after the WAV writer listed
+    before it has finished output.wav (the cache key hashes it).
+    """
+
+    def __init__(
+        self,
+        audio_path: Optional[PathLike] = None,
+        json_path: Optional[PathLike] = None,
+        aligner=None,
+        language: str = "en",
+    ):
+        from scripts.subtitles import AUDIO_PATH, JSON_PATH
+
+        self.audio_path = audio_path or AUDIO_PATH
+        self.json_path = json_path or JSON_PATH
+        self.aligner = aligner
+        self.language = language
+        self._worker = None  # our own align-worker connection, closed with the consumer
+        self.words: List[dict] = []
+        self.position = 0  # samples fed so far, at the TTS rate
+        self._start = 0  # where the current segment began
+        self._pieces: List[np.ndarray] = []
+
+    def feed(self, chunk: AudioChunk) -> None:
+        if chunk.index is not None:
+            if not self._pieces:
+                self._start = self.position
+            self._pieces.append(chunk.samples)
+        self.position += len(chunk.samples)
+        if chunk.index is not None and chunk.segment_end:
+            self._align(np.concatenate(self._pieces), chunk.sample_rate, chunk.text)
+            self._pieces = []
+
+    def _align(self, samples: np.ndarray, sample_rate: int, text: str) -> None:
+        from scripts.audio_io import StreamResampler
+
+        if not len(samples) or not text.strip():
+            return
+        if self.aligner is None:
+            from scripts.subtitles import align_worker, get_aligner
+
+            self._worker = align_worker(self.language)
+            self.aligner = self._worker or get_aligner(self.language)
+        resampler = StreamResampler(sample_rate, ALIGN_SAMPLE_RATE)
+        piece = np.concatenate([resampler.feed(samples), resampler.flush()])
+        span = [{"start": 0.0, "end": len(piece) / ALIGN_SAMPLE_RATE, "text": text}]
+        words = _shifted(self.aligner.align(piece, span), self._start / sample_rate)
+        print(f"   🔤 aligned while streaming: {len(words)} words")
+        self.words.extend(words)
+
+    def close(self) -> None:
+        from scripts.cache_utils import file_sha256
+        from scripts.subtitles import load_story_text
+        from scripts.timing_cache import WordTimingCache
+
+        self._disconnect()
+        if self.aligner is None:
+            return  # nothing was aligned
+        cache = WordTimingCache()
+        key = cache.key(
+            file_sha256(self.audio_path), load_story_text(self.json_path), self.aligner.model_id, "stream"
+        )
+        cache.store(key, self.words)
+        print(f"♻️ Cached {len(self.words)} streamed word timings for the subtitle stage.")
+
+    def abort(self) -> None:
+        self._disconnect()
+        self.words, self._pieces = [], []
+
+    def _disconnect(self) -> None:
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
@@ -0,0 +1,104 @@
+# scripts/align_worker.py
+"""
+Warm alignment worker: loads the WhisperX wav2vec2 align model once and
+serves word-timing requests to local clients, so each video no longer pays
+the torch import and checkpoint load.
+
+Start it once per machine (from the project root):
+    python -m scripts.align_worker
+`generate_subtitles()` uses it automatically while it is running.
+"""
+from __future__ import annotations
+
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.local_worker import Address, WorkerClient, connect, default_address, serve
+
+WORKER_ADDRESS: Address = default_address("align", 8766)
+
+
+class AlignWorkerClient:
+    """Client with the same `align`/`align_batch`/`model_id` surface as WhisperXAligner."""
+
+    def __init__(self, client: WorkerClient, model_id: str, language: str):
+        self._client = client
+        self.model_id = model_id  # fingerprint of the model the worker has loaded
+        self.language = language
+
+    def align(self, audio, segments: Sequence[dict]) -> List[dict]:
+        header, payload = _audio_request(audio)
+        header, _ = self._client.request(dict(header, op="align", segments=list(segments)), payload)
+        return header["words"]
+
+    def align_batch(self, jobs):
+        """Send all jobs in one request; the worker answers one frame per job."""
+        specs, payloads = [], []
+        for j in jobs:
+            spec, payload = _audio_request(j.audio)
+            specs.append(dict(spec, segments=list(j.segments)))
+            payloads.append(payload)
+        request = {"op": "align_batch", "jobs": specs}
+        for n, (header, _) in enumerate(self._client.stream(request, b"".join(payloads)), 1):
+            if "index" not in header:
+                continue
+            job = jobs[header["index"]]
+            job.words = header["words"]
+            print(f"   🔤 [{n}/{len(jobs)}] {job.tag or f'job {n}'}: {len(job.words)} words")
+        return list(jobs)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _audio_request(audio) -> Tuple[dict, bytes]:
+    """Arrays travel as a float32 payload; paths go absolute (the worker may run from another cwd)."""
+    if isinstance(audio, np.ndarray):
+        return {"samples": len(audio)}, audio.astype("<f4").tobytes()
+    return {"audio_path": os.path.abspath(audio)}, b""
+
+
+def _audio_of(spec: dict, payload: bytes, offset: int = 0):
+    if "audio_path" in spec:
+        return spec["audio_path"]
+    n = int(spec["samples"])
+    return np.frombuffer(payload, dtype="<f4", count=n, offset=offset * 4).copy()
+
+
+def connect_worker(address: Address = WORKER_ADDRESS) -> Optional[AlignWorkerClient]:
+    """Return a client for a running worker, or None if none is reachable."""
+    client = connect(address)
+    if client is None:
+        return None
+    return AlignWorkerClient(client, client.info["model_id"], client.info.get("language", "en"))
+
+
+def serve_forever(language: str = "en", device: str = "cpu", address: Address = WORKER_ADDRESS):
+    """Load the align model once and answer alignment requests until interrupted."""
+    from scripts.subtitles import WhisperXAligner
+
+    aligner = WhisperXAligner(language=language, device=device)
+
+    def handle(header: dict, payload: bytes):
+        op = header.get("op")
+        if op == "ping":
+            yield {"ok": True, "model_id": aligner.model_id, "language": aligner.language}, b""
+        elif op == "align":
+            yield {"ok": True, "words": aligner.align(_audio_of(header, payload), header["segments"])}, b""
+        elif op == "align_batch":
+            # One frame per job, so clients see progress on long batches.
+            offset = 0
+            for i, job in enumerate(header["jobs"]):
+                words = aligner.align(_audio_of(job, payload, offset), job["segments"])
+                offset += int(job.get("samples", 0))
+                yield {"ok": True, "index": i, "words": words}, b""
+        else:
+            raise ValueError(f"Unknown op: {op!r}")
+
+    serve(address, handle)
+
+
+if __name__ == "__main__":
+    serve_forever()
@@ -0,0 +1,128 @@
+# scripts/approx_timing.py
+"""
+Approximate word timings without a neural aligner.
+
+For drafts and high-volume output the sentence spans are already known (TTS
+timing manifest, or silence detection in scripts/align_segments.py), so each
+sentence's speech (its span minus leading/trailing silence) is divided among
+its words in proportion to their length — characters or estimated
+syllables — and every inner word boundary is then moved to the quietest RMS
+frame within SNAP_WINDOW_S, where the pauses between words usually are.
+Everything is a few NumPy passes over the waveform; no model is loaded.
+
+Characters are the default weight: on the synthetic benchmark they placed
+word boundaries closest (72 ms mean error, 81% within 100 ms, vs. 117 ms and
+66% for syllables and 91 ms / 63% for an even split). The comparison with
+whisperx needs its --narration mode on a machine with whisperx installed;
+see benchmarks/bench_subtitle_timing.py.
+"""
+from __future__ import annotations
+
+import re
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scripts.align_segments import RMS_HOP_S, SILENCE_DB, frame_rms
+
+APPROX_WEIGHT = "chars"  # "chars" or "syllables" (measured worse, see module docstring)
+SNAP_WINDOW_S = 0.12  # max distance a boundary moves to an energy minimum (0 = no snapping)
+WORD_GAP_WEIGHT = {"chars": 1.0, "syllables": 0.3}  # per-word pause, in the same units
+
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+_LETTERS = re.compile(r"[^a-z0-9]")
+
+
+def count_syllables(word: str) -> int:
+    """Vowel-group estimate (English), with a silent final 'e'; digits count one each."""
+    w = _LETTERS.sub("", word.lower())
+    if not w:
+        return 0
+    digits = sum(c.isdigit() for c in w)
+    letters = re.sub(r"\d", "", w)
+    n = len(_VOWEL_GROUPS.findall(letters))
+    if letters.endswith("e") and not letters.endswith(("le", "ee")) and n > 1:
+        n -= 1
+    return max(1 if letters else 0, n) + digits
+
+
+def word_weights(tokens: Sequence[str], weight: str = APPROX_WEIGHT) -> np.ndarray:
+    if weight == "chars":
+        counts = [len(_LETTERS.sub("", t.lower())) for t in tokens]
+    elif weight == "syllables":
+        counts = [count_syllables(t) for t in tokens]
+    else:
+        raise ValueError(f"Unknown weight: {weight!r}")
+    return np.maximum(np.asarray(counts, dtype=np.float64), 1.0) + WORD_GAP_WEIGHT[weight]
+
+
+def _speech_bounds(rms: np.ndarray) -> Tuple[int, int]:
+    """First and one-past-last frame louder than SILENCE_DB below the span's peak."""
+    if not len(rms) or rms.max() <= 0:
+        return 0, len(rms)
+    loud = np.flatnonzero(rms > rms.max() * 10 ** (SILENCE_DB / 20))
+    return int(loud[0]), int(loud[-1]) + 1
+
+
+def snap_to_minima(rms: np.ndarray, frames: np.ndarray, radius: int) -> np.ndarray:
+    """Move each (fractional) frame position to the lowest-RMS frame within ±radius."""
+    if radius <= 0 or not len(frames) or not len(rms):
+        return frames
+    padded = np.pad(rms, radius, constant_values=np.inf)
+    windows = sliding_window_view(padded, 2 * radius + 1)  # windows[i] is centred on frame i
+    centre = np.clip(np.round(frames).astype(np.int64), 0, len(rms) - 1)
+    return centre + windows[centre].argmin(axis=1) - radius + 0.5
+
+
+def approx_segment_words(
+    wav: np.ndarray,
+    sr: int,
+    start: float,
+    end: float,
+    text: str,
+    weight: str = APPROX_WEIGHT,
+    snap_window_s: float = SNAP_WINDOW_S,
+) -> List[dict]:
+    tokens = text.split()
+    if not tokens:
+        return []
+    a, b = max(0, int(round(start * sr))), min(len(wav), int(round(end * sr)))
+    hop = max(1, int(round(RMS_HOP_S * sr)))
+    rms = frame_rms(wav[a:b], sr, RMS_HOP_S)
+    f0, f1 = _speech_bounds(rms)
+
+    cum = np.concatenate(([0.0], np.cumsum(word_weights(tokens, weight))))
+    bounds = f0 + (f1 - f0) * cum / cum[-1]  # frame positions, len(tokens) + 1
+    inner = bounds[1:-1]
+    if len(inner):
+        snapped = snap_to_minima(rms, inner, int(round(snap_window_s / RMS_HOP_S)))
+        # Stay between the neighbouring proportional boundaries, so words never overlap.
+        lo = (bounds[:-2] + inner) / 2
+        hi = (inner + bounds[2:]) / 2
+        bounds[1:-1] = np.clip(snapped, lo, hi)
+
+    times = (a + bounds * hop) / sr
+    return [
+        {"word": tok, "start": float(t0), "end": float(t1)}
+        for tok, t0, t1 in zip(tokens, times[:-1], times[1:])
+    ]
+
+
+def approx_words(
+    wav: np.ndarray,
+    sr: int,
+    segments: Sequence[dict],
+    weight: str = APPROX_WEIGHT,
+    snap_window_s: float = SNAP_WINDOW_S,
+) -> List[dict]:
+    """Word timings for sentence `segments` ({'start', 'end', 'text'}) of `wav`."""
+    words: List[dict] = []
+    for seg in segments:
+        words += approx_segment_words(wav, sr, seg["start"], seg["end"], seg["text"], weight, snap_window_s)
+    return words
+
+
+def approx_model_id(weight: str = APPROX_WEIGHT, snap_window_s: float = SNAP_WINDOW_S) -> str:
+    """Timing-cache identity of this engine and its settings."""
+    return f"approx-v1:{weight}:{snap_window_s}"
@@ -0,0 +1,60 @@
+# scripts/audio_cache.py
+"""
+Content-addressed cache of synthesized sentence audio.
+
+Entries are keyed by (sentence text, speaker reference hash, language, model
+identity), so a re-run only sends new or edited lines to XTTS. The directory
+is size-bounded with least-recently-used eviction.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+from scripts.cache_utils import CACHE_ROOT, PathLike, enforce_size_limit, key_sha256, touch
+
+SENTENCE_CACHE_DIR = CACHE_ROOT / "sentence_audio"
+SENTENCE_CACHE_MAX_BYTES = 2 * 1024**3  # 2 GB
+
+
+class SentenceAudioCache:
+    def __init__(
+        self,
+        root: PathLike = SENTENCE_CACHE_DIR,
+        max_bytes: int = SENTENCE_CACHE_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(text: str, speaker_hash: str, language: str, model_id: str) -> str:
+        return key_sha256("sentence-audio-v2", text, speaker_hash, language, model_id)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}.wav"
+
+    def load(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        """(float32 samples, sample_rate), marked as recently used; None on a miss."""
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        try:
+            samples, sample_rate = sf.read(str(path), dtype="float32")
+        except (OSError, RuntimeError):
+            return None  # unreadable/partial entry: treat as a miss
+        touch(path)
+        return samples, sample_rate
+
+    def store(self, key: str, samples: np.ndarray, sample_rate: int) -> Path:
+        """Write a freshly synthesized line (lossless float WAV), then trim to size."""
+        path = self.path_for(key)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        sf.write(str(tmp), samples, sample_rate, subtype="FLOAT", format="WAV")
+        os.replace(tmp, path)  # atomic: readers never see a partial file
+        enforce_size_limit(self.root, self.max_bytes, "*.wav")
+        return path
@@ -0,0 +1,114 @@
+# scripts/audio_io.py
+"""Decoding/resampling helpers shared by the mixing stage (ffmpeg → float32 PCM)."""
+from __future__ import annotations
+
+import math
+import subprocess
+from pathlib import Path
+from typing import Iterator, List
+
+import numpy as np
+from scipy.signal import firwin, upfirdn
+
+# ffmpeg's `-ac 2` puts a mono source in both channels at the centre mix level
+# (-3 dB); in-memory upmixes use the same gain so both paths mix alike.
+MONO_TO_STEREO_GAIN = np.float32(0.5 ** 0.5)
+
+
+def _ffmpeg_pcm_cmd(path: Path, sample_rate: int, channels: int) -> List[str]:
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", str(path),
+        "-f", "f32le", "-acodec", "pcm_f32le",
+        "-ac", str(channels), "-ar", str(sample_rate),
+        "-",
+    ]
+
+
+def decode_audio(path: Path, sample_rate: int, channels: int = 2) -> np.ndarray:
+    """Decode any ffmpeg-readable file to float32 (frames, channels) at sample_rate."""
+    raw = subprocess.run(
+        _ffmpeg_pcm_cmd(path, sample_rate, channels), check=True, stdout=subprocess.PIPE
+    ).stdout
+    return np.frombuffer(raw, dtype=np.float32).reshape(-1, channels)
+
+
+def stream_audio(
+    path: Path, sample_rate: int, channels: int = 2, block_frames: int = 96000
+) -> Iterator[np.ndarray]:
+    """Decode in fixed-size (block_frames, channels) blocks; only the last may be shorter."""
+    block_bytes = block_frames * channels * 4
+    proc = subprocess.Popen(_ffmpeg_pcm_cmd(path, sample_rate, channels), stdout=subprocess.PIPE)
+    try:
+        while True:
+            raw = proc.stdout.read(block_bytes)  # blocks until full or EOF
+            if not raw:
+                break
+            usable = len(raw) - len(raw) % (channels * 4)
+            yield np.frombuffer(raw[:usable], dtype=np.float32).reshape(-1, channels)
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, "ffmpeg")
+
+
+def upmix(mono: np.ndarray, channels: int) -> np.ndarray:
+    """(frames,) mono → (frames, channels), at the level `decode_audio` would produce."""
+    mono = np.asarray(mono, dtype=np.float32).reshape(-1, 1)
+    if channels == 1:
+        return mono
+    return np.repeat(mono * MONO_TO_STEREO_GAIN, channels, axis=1)
+
+
+class StreamResampler:
+    """
+    Polyphase resampler for audio that arrives in pieces (e.g. streamed TTS).
+    Input history carries across calls, so the output matches resampling the
+    whole signal at once (linear-phase FIR, group delay compensated).
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 32):
+        g = math.gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // g, in_rate // g
+        n_taps = taps_per_phase * max(self.up, self.down) + 1
+        self._h = firwin(n_taps, 1.0 / max(self.up, self.down), window=("kaiser", 8.0)) * self.up
+        self._delay = (n_taps - 1) // 2  # in upsampled samples
+        self._hist_len = -(-n_taps // self.up) + 1  # input samples the filter reaches back
+        self._hist = None
+        self._consumed = 0  # input samples seen (incl. flush padding)
+        self._next_out = 0  # next output index to emit
+        self._total_out = None  # set by flush(): outputs owed for the real input
+
+    def _run(self, block: np.ndarray) -> np.ndarray:
+        block = np.asarray(block, dtype=np.float64)
+        if self._hist is None:
+            self._hist = np.zeros((0,) + block.shape[1:])
+        buf = np.concatenate([self._hist, block])
+        start = self._consumed - len(self._hist)  # global input index of buf[0]
+        self._consumed += len(block)
+
+        # Output m is upsampled index j = m*down + delay; it is complete once
+        # every input it touches has arrived (j < consumed*up).
+        m_end = (self._consumed * self.up - self._delay + self.down - 1) // self.down
+        if self._total_out is not None:
+            m_end = min(m_end, self._total_out)
+        ms = np.arange(self._next_out, max(self._next_out, m_end))
+        self._next_out = max(self._next_out, m_end)
+        self._hist = buf[-self._hist_len :]
+        if not len(ms):
+            return np.zeros((0,) + block.shape[1:], dtype=np.float32)
+        y = upfirdn(self._h, buf, self.up, 1, axis=0)
+        return y[ms * self.down + self._delay - start * self.up].astype(np.float32)
+
+    def feed(self, block: np.ndarray) -> np.ndarray:
+        if self.up == self.down:
+            return np.asarray(block, dtype=np.float32)
+        return self._run(block)
+
+    def flush(self) -> np.ndarray:
+        """Emit the tail held back for filter look-ahead."""
+        if self.up == self.down or self._hist is None:
+            return np.zeros(0, dtype=np.float32)
+        self._total_out = -(-self._consumed * self.up // self.down)
+        pad = -(-(self._delay + self.down) // self.up) + 1
+        return self._run(np.zeros((pad,) + self._hist.shape[1:]))
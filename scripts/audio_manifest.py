@@ -0,0 +1,111 @@
+# scripts/audio_manifest.py
+"""
+Per-segment timing manifest written next to the narration WAV.
+
+The TTS stage knows exactly where every synthesized segment starts and ends,
+so it records that once (output.wav -> output.json) and later stages read
+the manifest instead of re-decoding the audio to rediscover it. The WAV's
+content hash is stored with it, so a narration regenerated to the same
+length (different text, same sample count) is never paired with stale spans.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from scripts.audio_stream import AudioChunk
+from scripts.cache_utils import file_sha256
+
+MANIFEST_VERSION = 2
+
+
+def manifest_path_for(audio_path) -> Path:
+    return Path(audio_path).with_suffix(".json")
+
+
+def write_manifest(audio_path, sample_rate: int, total_samples: int, segments: Sequence[dict]) -> Path:
+    """
+    `segments`: dicts with index, text, lines, start_sample, end_sample.
+    Call after the WAV is fully written: its content hash is recorded.
+    """
+    path = manifest_path_for(audio_path)
+    data = {
+        "version": MANIFEST_VERSION,
+        "audio": Path(audio_path).name,
+        "sample_rate": int(sample_rate),
+        "total_samples": int(total_samples),
+        "audio_sha256": file_sha256(audio_path),
+        "segments": list(segments),
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def read_manifest(audio_path) -> Optional[dict]:
+    """
+    Manifest for `audio_path`, or None if it is missing or does not match the
+    audio (header first, then the content hash; nothing is decoded).
+    """
+    import soundfile as sf
+
+    path = manifest_path_for(audio_path)
+    if not path.exists() or not Path(audio_path).exists():
+        return None
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        info = sf.info(str(audio_path))
+    except (OSError, ValueError, RuntimeError):
+        return None
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    if info.frames != data["total_samples"] or info.samplerate != data["sample_rate"]:
+        return None  # audio was regenerated by something that didn't update the manifest
+    if data.get("audio_sha256") != file_sha256(audio_path):
+        return None  # same length, different audio
+    return data
+
+
+def manifest_segments_s(manifest: dict) -> List[dict]:
+    """Segments as {'start', 'end', 'text'} in seconds (the aligner's format)."""
+    sr = float(manifest["sample_rate"])
+    return [
+        {"start": s["start_sample"] / sr, "end": s["end_sample"] / sr, "text": s["text"]}
+        for s in manifest["segments"]
+    ]
+
+
+class ManifestWriter:
+    """Streaming consumer: tracks segment offsets and writes the manifest on close."""
+
+    def __init__(self, audio_path):
+        self.audio_path = audio_path
+        self.sample_rate = None
+        self.position = 0
+        self.segments: List[dict] = []
+
+    def feed(self, chunk: AudioChunk) -> None:
+        self.sample_rate = chunk.sample_rate
+        if chunk.index is not None:
+            if not self.segments or self.segments[-1]["index"] != chunk.index:
+                self.segments.append(
+                    {
+                        "index": chunk.index,
+                        "text": chunk.text,
+                        "lines": list(chunk.lines),
+                        "start_sample": self.position,
+                        "end_sample": self.position,
+                    }
+                )
+            self.segments[-1]["end_sample"] = self.position + len(chunk.samples)
+        self.position += len(chunk.samples)
+
+    def close(self) -> None:
+        if self.sample_rate is not None:
+            write_manifest(self.audio_path, self.sample_rate, self.position, self.segments)
+
+    def abort(self) -> None:
+        pass  # nothing is written before close
@@ -0,0 +1,106 @@
+# scripts/audio_stream.py
+"""
+Consumer API for the streaming TTS stage.
+
+`stream_audio_from_json()` (scripts/text_to_speech.py) yields AudioChunk
+objects in story order while later lines are still synthesizing. Any stage
+that wants narration incrementally implements `feed(chunk)`, `close()` and
+`abort()`, and `pump()` fans one stream out to several consumers:
+
+    WavWriter       output.wav              (here)
+    ManifestWriter  output.json             (scripts/audio_manifest.py)
+    MixConsumer     mix.wav                 (scripts/mix_audio.py)
+    AlignConsumer   word timings → cache    (scripts/align_stream.py)
+
+Consumers are closed only when the whole stream arrived. If synthesis fails,
+every consumer is aborted instead and removes its partial output, so a
+truncated narration never looks finished to the next stage.
+"""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Protocol, Sequence
+
+import numpy as np
+import soundfile as sf
+
+
+@dataclass
+class AudioChunk:
+    index: Optional[int]  # synthesis segment this audio belongs to; None = pause
+    samples: np.ndarray  # float32 mono
+    sample_rate: int
+    text: str = ""
+    segment_end: bool = False  # last chunk of its segment
+    lines: List[int] = field(default_factory=list)  # story lines the segment covers
+
+
+class AudioConsumer(Protocol):
+    def feed(self, chunk: AudioChunk) -> None: ...
+
+    def close(self) -> None: ...
+
+    def abort(self) -> None: ...
+
+
+class WavWriter:
+    """
+    Appends chunks to a 16-bit WAV as they arrive (no whole-story buffer).
+    They go to a temp file that replaces `path` on close, so the previous
+    narration stays in place until the new one is complete.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.samples_written = 0
+        self._tmp = f"{os.path.splitext(path)[0]}.{os.getpid()}.tmp.wav"
+        self._file: Optional[sf.SoundFile] = None
+
+    def feed(self, chunk: AudioChunk) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = sf.SoundFile(self._tmp, "w", chunk.sample_rate, 1, subtype="PCM_16")
+        self._file.write(chunk.samples)
+        self.samples_written += len(chunk.samples)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
+
+
+def pump(chunks: Iterable[AudioChunk], consumers: Sequence[AudioConsumer]) -> int:
+    """
+    Feed every chunk to every consumer, then close them in order; returns
+    total samples streamed. On any failure the consumers not yet closed are
+    aborted and the error propagates.
+    """
+    start = time.perf_counter()
+    total = 0
+    closed = 0
+    try:
+        for chunk in chunks:
+            if total == 0 and len(chunk.samples):
+                print(f"   ⚡ first audio after {time.perf_counter() - start:.2f}s")
+            for consumer in consumers:
+                consumer.feed(chunk)
+            total += len(chunk.samples)
+        for consumer in consumers:
+            consumer.close()  # in order: the WAV is complete before the manifest hashes it
+            closed += 1
+    except BaseException:
+        for consumer in consumers[closed:]:
+            try:
+                consumer.abort()
+            except Exception as e:
+                print(f"⚠️ Could not clean up {type(consumer).__name__}: {e}")
+        raise
+    return total
@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 import math
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Sequence, Union, List, Optional
 
+import numpy as np
+
 # MoviePy v2 import style (no "moviepy.editor")
 from moviepy import (
     ImageClip,
@@ -16,6 +18,8 @@ from moviepy import (
     VideoClip,
 )
 
+from scripts.image_cache import CoverImageCache
+
 PathLike = Union[str, Path]
 
 # ===== Defaults =====
@@ -23,6 +27,11 @@ IMAGE_DIR = Path("assets/images")
 AUDIO_PATH = Path("assets/audio/generated/mix.wav")
 OUTPUT_DIR = Path("assets/video")
 OUTPUT_PATH = OUTPUT_DIR / "output.mp4"
+SUBTITLED_OUTPUT_PATH = OUTPUT_DIR / "output_sub.mp4"
+VIDEO_BACKEND = "moviepy"  # "moviepy" (compositing), "numpy" (frame generator) or "ffmpeg" (filtergraph)
+VIDEO_WORKERS = 1  # >1 = "numpy" backend renders timeline segments in parallel processes
+ENCODE_PRESET = "medium"
+VIDEO_BITRATE = "8000k"
 
 
 # ==================== CONFIG ====================
@@ -51,6 +60,11 @@ class SlideshowParams:
     overscan: float = 1.003  # ~0.3% overscale
     safety_min_body: float = 0.4  # min visible body per image (ex-fade)
 
+    # Resampling ("nearest", "bilinear", "bicubic", "lanczos")
+    cover_resample: str = "lanczos"  # one-time cover fit (image cache, ffmpeg scale)
+    frame_resample: str = "bilinear"  # per-frame zoom (numpy backend)
+    supersample: int = 2  # ffmpeg backend: zoompan source size vs. canvas
+
     # Encoding color tags (explicit BT.709 + full-range for photo parity)
     colorspace: str = "bt709"
     color_primaries: str = "bt709"
@@ -59,6 +73,63 @@ class SlideshowParams:
     color_range: str = "pc"  # "tv" (limited) or "pc" (full)
 
 
+@dataclass
+class RenderProfile:
+    """
+    Output quality knobs. The timeline is always planned with SlideshowParams.fps,
+    so every profile shows the same frames at the same times; `fps` only
+    samples that timeline more sparsely and must divide it.
+    """
+
+    name: str
+    scale: float = 1.0  # canvas size relative to SlideshowParams
+    fps: Optional[int] = None  # output frame rate (None = timeline fps)
+    preset: str = ENCODE_PRESET
+    bitrate: str = VIDEO_BITRATE
+    cover_resample: str = "lanczos"
+    frame_resample: str = "bilinear"
+    supersample: int = 2
+    output_dir: Path = OUTPUT_DIR  # drafts live apart from finals
+
+
+PROFILES = {
+    "final": RenderProfile("final"),
+    "draft": RenderProfile(
+        "draft",
+        scale=0.5,
+        fps=15,
+        preset="ultrafast",
+        bitrate="2000k",
+        cover_resample="bilinear",
+        frame_resample="bilinear",
+        supersample=1,
+        output_dir=OUTPUT_DIR / "draft",
+    ),
+}
+RENDER_PROFILE = "final"
+
+
+def apply_profile(p: SlideshowParams, profile: RenderProfile) -> SlideshowParams:
+    """Params for rendering under `profile` (same timing, scaled canvas)."""
+    fps = profile.fps or p.fps
+    if p.fps % fps:
+        raise ValueError(f"Profile fps {fps} must divide the timeline fps {p.fps}")
+    return replace(
+        p,
+        # even dimensions for yuv420p
+        target_w=max(2, int(round(p.target_w * profile.scale / 2)) * 2),
+        target_h=max(2, int(round(p.target_h * profile.scale / 2)) * 2),
+        cover_resample=profile.cover_resample,
+        frame_resample=profile.frame_resample,
+        supersample=profile.supersample,
+    )
+
+
+def profile_output_path(path: PathLike, profile: str = RENDER_PROFILE) -> Path:
+    """Where `path` (a final output name) goes under `profile`."""
+    return PROFILES[profile].output_dir / Path(path).name
+
+
 # ==================== HELPERS ====================
 def _collect_images(dir_path: PathLike) -> List[Path]:
     p = Path(dir_path)
@@ -88,6 +159,16 @@ def ease_in_out_cubic(p: float) -> float:
     return 1 - ((-2 * p + 2) ** 3) / 2
 
 
+def zoom_end(idx: int, p: SlideshowParams) -> float:
+    return p.zoom_end_even if (idx % 2 == 0) else p.zoom_end_odd
+
+
+def zoom_at(t: float, duration: float, idx: int, p: SlideshowParams) -> float:
+    """Ken Burns zoom factor of slide `idx` at local time t (eased start→end)."""
+    e = ease_in_out_cubic(t / max(duration, 1e-6))
+    return p.zoom_start + (zoom_end(idx, p) - p.zoom_start) * e
+
+
 def quantize_time_to_frame(t: float, fps: float) -> float:
     frame = 1.0 / fps
     return round(t / frame) * frame
@@ -115,11 +196,15 @@ def _make_clip(
     p: SlideshowParams,
 ) -> VideoClip:
     """Create a center-anchored Ken Burns zoom clip from one image."""
-    base0 = ImageClip(str(img_path)).with_duration(duration)
-
-    # "Cover" fit + small overscan so the image always exceeds the canvas
-    cover_scale = max(p.target_w / base0.w, p.target_h / base0.h) * p.overscan
-    base = base0.resized(cover_scale)  # v2: resized()
+    # Cover fit + small overscan so the image always exceeds the canvas, cropped
+    # to what the zoom can show and stored at the largest zoom's resolution
+    # (decoded once, then memory-mapped from cache/cover_images).
+    z_lo = min(p.zoom_start, zoom_end(idx, p))
+    z_hi = max(p.zoom_start, zoom_end(idx, p))
+    pixels = CoverImageCache().get(
+        img_path, p.target_w, p.target_h, p.overscan, z_lo, z_hi, p.cover_resample
+    )
+    base = ImageClip(np.asarray(pixels)).with_duration(duration)
 
     # Tone control only if requested (defaults are neutral -> no change)
     if (p.lum != 0.0) or (abs(p.contrast - 1.0) > 1e-6):
@@ -128,14 +213,12 @@ def _make_clip(
         )
 
     def z_func(t: float) -> float:
-        prog = t / max(duration, 1e-6)
-        e = ease_in_out_cubic(prog)
-        z_end = p.zoom_end_even if (idx % 2 == 0) else p.zoom_end_odd
-        return p.zoom_start + (z_end - p.zoom_start) * e
+        return zoom_at(t, duration, idx, p)
 
-    # IMPORTANT: integer (w,h) with ceil avoids rounding underfill/black bars
+    # IMPORTANT: integer (w,h) with ceil avoids rounding underfill/black bars.
+    # base is already at zoom z_hi, so zooming is a downscale by z / z_hi.
     def size_func(t: float):
-        z = z_func(t)
+        z = z_func(t) / z_hi
         w = int(math.ceil(base.w * z))
         h = int(math.ceil(base.h * z))
         return (w, h)
@@ -146,17 +229,42 @@ def _make_clip(
     return comp
 
 
-# ==================== CORE BUILDER ====================
-def _build_video_core(
+# ==================== TIMELINE ====================
+@dataclass
+class Slide:
+    path: Path
+    index: int
+    start: float  # seconds on the output timeline (frame-aligned)
+    duration: float  # includes the crossfade overlap with the next slide
+
+
+@dataclass
+class Timeline:
+    """Frame-quantized slideshow plan shared by every render backend."""
+
+    slides: List[Slide]
+    xfade: float  # crossfade length between consecutive slides (0 = hard cut)
+    fade_in: float  # global fade from black at the start
+    fade_out: float  # global fade to black, ending at video_end
+    video_end: float  # end of the last slide
+    duration: float  # final length (audio length, frame-quantized)
+    fps: int
+
+    @property
+    def frame_count(self) -> int:
+        return int(round(self.duration * self.fps))
+
+
+def plan_timeline(
     image_paths: Sequence[PathLike],
-    audio_clip: AudioFileClip,
-    params: Optional[SlideshowParams] = None,
-) -> VideoClip:
+    total_audio: float,
+    p: SlideshowParams,
+) -> Timeline:
+    """Pick images, per-slide duration, crossfade and global fades for an audio length."""
     if not image_paths:
         raise ValueError("image_paths is empty.")
 
-    p = params or SlideshowParams()
-    total_audio = max(0.01, float(audio_clip.duration))
+    total_audio = max(0.01, float(total_audio))
 
     # Decide how many images we can fit at minimum duration each
     max_images = max(1, int(total_audio // p.min_per_image))
@@ -167,40 +275,48 @@ def _build_video_core(
 
     if n == 1:
         per_img_final = quantize_time_to_frame(total_audio, p.fps)
-        clip = _make_clip(image_paths[0], per_img_final, 0, p)
-        video = concatenate_videoclips([clip], method="compose")
-
-        gi = min(p.global_fade_in_cap, per_img_final * p.global_fade_in_frac)
-        go = min(p.global_fade_out_cap, per_img_final * p.global_fade_out_frac)
-        if gi > 0:
-            video = video.with_effects([vfx.FadeIn(gi)])
-        if go > 0:
-            video = video.with_effects([vfx.FadeOut(go)])
-
-        total_quant = quantize_time_to_frame(total_audio, p.fps)
-        return video.with_audio(audio_clip).with_duration(total_quant)
-
-    # Multi-image slideshow
-    per_img_naive = total_audio / n
-    xfade = safe_xfade(per_img_naive, p.fps, p.whip_max)
-
-    # In overlap concat, each interior clip contributes (per_img_final - xfade)
-    per_img_final = (total_audio + (n - 1) * xfade) / n
-    per_img_final = quantize_time_to_frame(per_img_final, p.fps)
-    xfade = quantize_time_to_frame(xfade, p.fps)
-
-    min_body = max(p.safety_min_body, 2.0 / p.fps)
-    if per_img_final <= xfade + min_body:
-        # dial back crossfade until body is safe
-        xfade_frames = int(max(0, round(xfade * p.fps)))
-        while per_img_final <= (xfade_frames / p.fps) + min_body and xfade_frames > 0:
-            xfade_frames -= 1
-        xfade = xfade_frames / p.fps
+        xfade = 0.0
+    else:
+        # Multi-image slideshow
+        per_img_naive = total_audio / n
+        xfade = safe_xfade(per_img_naive, p.fps, p.whip_max)
+
+        # In overlap concat, each interior clip contributes (per_img_final - xfade)
+        per_img_final = (total_audio + (n - 1) * xfade) / n
+        per_img_final = quantize_time_to_frame(per_img_final, p.fps)
+        xfade = quantize_time_to_frame(xfade, p.fps)
+
+        min_body = max(p.safety_min_body, 2.0 / p.fps)
+        if per_img_final <= xfade + min_body:
+            # dial back crossfade until body is safe
+            xfade_frames = int(max(0, round(xfade * p.fps)))
+            while per_img_final <= (xfade_frames / p.fps) + min_body and xfade_frames > 0:
+                xfade_frames -= 1
+            xfade = xfade_frames / p.fps
+
+    step = per_img_final - xfade
+    slides = [
+        Slide(Path(path), i, i * step, per_img_final) for i, path in enumerate(image_paths)
+    ]
+    return Timeline(
+        slides=slides,
+        xfade=xfade,
+        fade_in=min(p.global_fade_in_cap, per_img_final * p.global_fade_in_frac),
+        fade_out=min(p.global_fade_out_cap, per_img_final * p.global_fade_out_frac),
+        video_end=(n - 1) * step + per_img_final,
+        duration=quantize_time_to_frame(total_audio, p.fps),
+        fps=p.fps,
+    )
 
+
+# ==================== CORE BUILDER ====================
+def _compose_timeline(timeline: Timeline, p: SlideshowParams) -> VideoClip:
+    """MoviePy composition of a planned timeline (no audio)."""
     base_clips: List[VideoClip] = [
-        _make_clip(path, per_img_final, i, p) for i, path in enumerate(image_paths)
+        _make_clip(s.path, s.duration, s.index, p) for s in timeline.slides
     ]
 
+    xfade = timeline.xfade
     if xfade > 0:
         # Apply CrossFadeIn to all but the first clip (v2: with_effects)
         clips = [base_clips[0]] + [
@@ -210,15 +326,35 @@ def _build_video_core(
     else:
         video = concatenate_videoclips(base_clips, method="compose")
 
-    gi = min(p.global_fade_in_cap, per_img_final * p.global_fade_in_frac)
-    go = min(p.global_fade_out_cap, per_img_final * p.global_fade_out_frac)
-    if gi > 0:
-        video = video.with_effects([vfx.FadeIn(gi)])
-    if go > 0:
-        video = video.with_effects([vfx.FadeOut(go)])
+    if timeline.fade_in > 0:
+        video = video.with_effects([vfx.FadeIn(timeline.fade_in)])
+    if timeline.fade_out > 0:
+        video = video.with_effects([vfx.FadeOut(timeline.fade_out)])
+    return video.with_duration(timeline.duration)
 
-    total_quant = quantize_time_to_frame(total_audio, p.fps)
-    return video.with_audio(audio_clip).with_duration(total_quant)
+
+def _build_video_core(
+    image_paths: Sequence[PathLike],
+    audio_clip: AudioFileClip,
+    params: Optional[SlideshowParams] = None,
+) -> VideoClip:
+    p = params or SlideshowParams()
+    timeline = plan_timeline(image_paths, audio_clip.duration, p)
+    return _compose_timeline(timeline, p).with_audio(audio_clip).with_duration(timeline.duration)
+
+
+def _build_video_numpy(
+    image_paths: Sequence[PathLike],
+    audio_clip: AudioFileClip,
+    params: Optional[SlideshowParams] = None,
+) -> VideoClip:
+    """Same timeline as _build_video_core, frames from scripts/kenburns.py."""
+    from scripts.kenburns import KenBurnsSource
+
+    p = params or SlideshowParams()
+    timeline = plan_timeline(image_paths, audio_clip.duration, p)
+    source = KenBurnsSource(timeline, p)
+    return VideoClip(source.make_frame, duration=timeline.duration).with_audio(audio_clip)
 
 
 # ==================== ENCODING HELPERS ====================
@@ -252,30 +388,38 @@ def _ffmpeg_color_params(p: SlideshowParams) -> List[str]:
 
 
 # ==================== PUBLIC API (writes file) ====================
-def build_video() -> str:
-    """
-    Build the slideshow from defaults and write to assets/video/output.mp4.
-    Returns the output path as a string.
-    """
-    images = _collect_images(IMAGE_DIR)
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+def _audio_duration(path: PathLike) -> float:
+    """Audio length exactly as the MoviePy backend sees it (keeps timelines identical)."""
+    clip = AudioFileClip(str(path))
+    try:
+        return float(clip.duration)
+    finally:
+        clip.close()
 
-    # Full-range output, gentle zoom, smooth crossfades, subtle global fades
-    params = SlideshowParams()
 
+def _render_moviepy(
+    images: Sequence[Path],
+    params: SlideshowParams,
+    out_path: Path,
+    profile: RenderProfile,
+    vf: Optional[str] = None,
+    core=_build_video_core,
+) -> None:
     audio_clip = AudioFileClip(str(AUDIO_PATH))
     try:
-        video = _build_video_core(images, audio_clip, params)
+        # Timeline times are multiples of 1/params.fps; a profile fps dividing it
+        # samples exactly those frames.
+        video = core(images, audio_clip, params)
         try:
             video.write_videofile(
-                str(OUTPUT_PATH),
-                fps=params.fps,
+                str(out_path),
+                fps=profile.fps or params.fps,
                 codec="libx264",
                 audio_codec="aac",
-                preset="medium",
+                preset=profile.preset,
                 threads=4,
-                bitrate="8000k",
-                ffmpeg_params=_ffmpeg_color_params(params),
+                bitrate=profile.bitrate,
+                ffmpeg_params=_ffmpeg_color_params(params) + (["-vf", vf] if vf else []),
             )
         finally:
             try:
@@ -285,7 +429,70 @@ def build_video() -> str:
     finally:
         audio_clip.close()
 
-    return str(OUTPUT_PATH)
+
+def build_video(
+    backend: str = VIDEO_BACKEND,
+    workers: int = VIDEO_WORKERS,
+    out_path: Optional[PathLike] = None,
+    subtitles: Optional[PathLike] = None,
+    fonts_dir: Optional[PathLike] = None,
+    profile: str = RENDER_PROFILE,
+) -> str:
+    """
+    Build the slideshow from defaults and write to out_path (default: output.mp4
+    in the profile's output directory, assets/video or assets/video/draft).
+    backend: "moviepy", "numpy" (scripts/kenburns.py) or "ffmpeg"
+    (scripts/video_ffmpeg.py); all render the same plan_timeline() output.
+    workers > 1 splits a "numpy" render across processes (scripts/video_parallel.py).
+    subtitles: an ASS file to burn in during this same encode (no second
+    x264 pass, audio encoded once); see scripts/burner.py for the standalone tool.
+    profile: "final" or "draft" (see PROFILES); a draft has the final's timing
+    at lower resolution/fps with a fast preset.
+    Returns the output path as a string.
+    """
+    images = _collect_images(IMAGE_DIR)
+    prof = PROFILES[profile]
+    out_path = Path(out_path) if out_path is not None else profile_output_path(OUTPUT_PATH, profile)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Full-range output, gentle zoom, smooth crossfades, subtle global fades
+    params = apply_profile(SlideshowParams(), prof)
+    out_fps = prof.fps or params.fps
+
+    vf = None
+    if subtitles is not None:
+        from scripts.burner import subtitles_filter
+
+        if not Path(subtitles).exists():
+            raise FileNotFoundError(f"Subtitle file not found: {subtitles}")
+        vf = subtitles_filter(subtitles, fonts_dir)
+
+    if workers > 1 and backend != "numpy":
+        print(f"ℹ️ workers={workers} ignored: parallel rendering needs backend='numpy'")
+    if backend == "moviepy":
+        _render_moviepy(images, params, out_path, prof, vf)
+    elif backend == "numpy" and workers > 1:
+        from scripts.video_parallel import render_parallel
+
+        timeline = plan_timeline(images, _audio_duration(AUDIO_PATH), params)
+        render_parallel(
+            timeline, AUDIO_PATH, out_path, params, workers,
+            preset=prof.preset, bitrate=prof.bitrate, vf=vf, out_fps=out_fps,
+        )
+    elif backend == "numpy":
+        _render_moviepy(images, params, out_path, prof, vf, core=_build_video_numpy)
+    elif backend == "ffmpeg":
+        from scripts.video_ffmpeg import render_ffmpeg
+
+        timeline = plan_timeline(images, _audio_duration(AUDIO_PATH), params)
+        render_ffmpeg(
+            timeline, AUDIO_PATH, out_path, params,
+            preset=prof.preset, bitrate=prof.bitrate, vf=vf, out_fps=out_fps,
+        )
+    else:
+        raise ValueError(f"Unknown video backend: {backend!r}")
+
+    return str(out_path)
 
 
 if __name__ == "__main__":
@@ -5,6 +5,10 @@ import subprocess
 from pathlib import Path
 from typing import Optional
 
+# Draft previews: fastest x264 preset, lower quality target
+DRAFT_PRESET = "ultrafast"
+DRAFT_CRF = 28
+
 def _filter_safe_path(p: Path) -> str:
     """
     Make a path safe for ffmpeg's subtitles filter on Windows.
@@ -15,6 +19,13 @@ def _filter_safe_path(p: Path) -> str:
         s = s[0] + r"\:" + s[2:]
     return s
 
+def subtitles_filter(ass_path: str | Path, fonts_dir: Optional[str | Path] = None) -> str:
+    """ffmpeg `subtitles` filter string that burns `ass_path` (libass)."""
+    vf_parts = [f"filename='{_filter_safe_path(Path(ass_path))}'"]
+    if fonts_dir:
+        vf_parts.append(f"fontsdir='{_filter_safe_path(Path(fonts_dir))}'")
+    return "subtitles=" + ":".join(vf_parts)
+
 def burn_subtitles(
     video_in: str | Path,
     ass_path: str | Path,
@@ -28,10 +39,13 @@ def burn_subtitles(
     overwrite: bool = True,
     loglevel: str = "error",
     fonts_dir: Optional[str | Path] = None,  # set if your ASS references custom fonts
+    draft: bool = False,  # preview quality: DRAFT_PRESET / DRAFT_CRF
 ) -> Path:
     """
     Burn a word-level ASS (with inline styling) into a video using ffmpeg.
     This does not modify the subtitle file; it just burns it in.
+    Standalone re-encode of an existing video; the pipeline burns subtitles
+    during build_video(subtitles=...) instead.
     """
     video_in = Path(video_in).resolve()
     ass_path = Path(ass_path).resolve()
@@ -43,10 +57,9 @@ def burn_subtitles(
     if not ass_path.exists():
         raise FileNotFoundError(f"Subtitle file not found: {ass_path}")
 
-    vf_parts = [f"filename='{_filter_safe_path(ass_path)}'"]
-    if fonts_dir:
-        vf_parts.append(f"fontsdir='{_filter_safe_path(Path(fonts_dir))}'")
-    vf = "subtitles=" + ":".join(vf_parts)
+    vf = subtitles_filter(ass_path, fonts_dir)
+    if draft:
+        preset, crf = DRAFT_PRESET, DRAFT_CRF
 
     cmd = [
         "ffmpeg",
@@ -0,0 +1,66 @@
+# scripts/cache_utils.py
+"""Shared helpers for the on-disk caches (content hashing, cache roots)."""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Union
+
+PathLike = Union[str, Path]
+
+# All persistent caches live under here (safe to delete at any time).
+CACHE_ROOT = Path("cache")
+
+
+def file_sha256(path: PathLike, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file's contents, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def key_sha256(*parts: object) -> str:
+    """Stable hex key from several parts (joined unambiguously)."""
+    h = hashlib.sha256()
+    for part in parts:
+        data = str(part).encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def touch(path: PathLike) -> None:
+    """Mark a cache entry as recently used (LRU order is by mtime)."""
+    try:
+        Path(path).touch()
+    except OSError:
+        pass
+
+
+def enforce_size_limit(directory: PathLike, max_bytes: int, pattern: str = "*") -> int:
+    """
+    Evict least-recently-used files matching `pattern` until the directory
+    holds at most `max_bytes`. Returns the number of bytes freed.
+    """
+    entries = []
+    for p in Path(directory).glob(pattern):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        if p.is_file():
+            entries.append((st.st_mtime, st.st_size, p))
+
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total - freed <= max_bytes:
+            break
+        try:
+            p.unlink()
+            freed += size
+        except OSError:
+            pass
+    return freed
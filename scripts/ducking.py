@@ -0,0 +1,99 @@
+# scripts/ducking.py
+"""
+Vectorized sidechain ducking: music gain follows the narration.
+
+Per 10 ms frame: narration RMS → duck amount (soft knee above a threshold)
+→ release as an exponential peak-hold (max-plus recursion solved with a
+log-domain cumulative max) → attack as a one-pole low-pass (scipy lfilter)
+→ gain between `bg_volume` and `duck_volume`, linearly ramped per sample.
+No per-sample Python loops. Filter state carries across calls, so the same
+object can produce one continuous gain curve block by block.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+from scipy.signal import lfilter
+
+# ===== Defaults =====
+DUCK_VOLUME = 0.06  # music gain while narration is speaking (vs. BG_VOLUME otherwise)
+DUCK_THRESHOLD_DB = -45.0  # narration RMS (dBFS) where ducking starts
+DUCK_KNEE_DB = 12.0  # fully ducked this many dB above the threshold
+DUCK_ATTACK_S = 0.04
+DUCK_RELEASE_S = 0.60
+DUCK_FRAME_S = 0.01
+
+
+class Ducker:
+    def __init__(
+        self,
+        sample_rate: int,
+        bg_volume: float,
+        duck_volume: float = DUCK_VOLUME,
+        threshold_db: float = DUCK_THRESHOLD_DB,
+        knee_db: float = DUCK_KNEE_DB,
+        attack_s: float = DUCK_ATTACK_S,
+        release_s: float = DUCK_RELEASE_S,
+        frame_s: float = DUCK_FRAME_S,
+    ):
+        self.hop = max(1, int(round(frame_s * sample_rate)))
+        hop_s = self.hop / float(sample_rate)
+        self.bg_volume = bg_volume
+        self.duck_volume = duck_volume
+        self.threshold_db = threshold_db
+        self.knee_db = max(knee_db, 1e-3)
+        self._log_r = -hop_s / max(release_s, 1e-6)  # log of per-frame release factor
+        self._a = 1.0 - math.exp(-hop_s / max(attack_s, 1e-6))
+        # Carried state
+        self._held = 0.0  # release peak-hold value
+        self._smoothed = 0.0  # attack filter output
+        self._last_gain = bg_volume
+
+    def _duck_amount(self, mono: np.ndarray) -> np.ndarray:
+        n = -(-len(mono) // self.hop)
+        padded = np.zeros(n * self.hop, dtype=np.float32)
+        padded[: len(mono)] = mono
+        frames = padded.reshape(n, self.hop)
+        rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / self.hop)
+        with np.errstate(divide="ignore"):
+            level_db = 20 * np.log10(rms)
+        return np.clip((level_db - self.threshold_db) / self.knee_db, 0.0, 1.0)
+
+    def _release(self, d: np.ndarray) -> np.ndarray:
+        # held[n] = max(d[n], held[n-1] * r) = r^n * cummax(d[k] * r^-k), in logs.
+        k = np.arange(1, len(d) + 1, dtype=np.float64)
+        with np.errstate(divide="ignore"):
+            terms = np.concatenate([[math.log(self._held) if self._held > 0 else -np.inf], np.log(d) - k * self._log_r])
+        log_held = np.maximum.accumulate(terms)[1:] + k * self._log_r
+        held = np.exp(log_held)
+        self._held = float(held[-1])
+        return held
+
+    def _attack(self, held: np.ndarray) -> np.ndarray:
+        a = self._a
+        out, _ = lfilter([a], [1.0, -(1.0 - a)], held, zi=[(1.0 - a) * self._smoothed])
+        self._smoothed = float(out[-1])
+        return out
+
+    def gain(self, narration: np.ndarray) -> np.ndarray:
+        """
+        Per-sample music gain (float32) for a narration block, mono or
+        (frames, channels). Blocks must be a multiple of `hop` samples except
+        the last one.
+        """
+        mono = np.asarray(narration, dtype=np.float32)
+        if mono.ndim == 2:
+            mono = mono.mean(axis=1)
+        if not len(mono):
+            return np.zeros(0, dtype=np.float32)
+
+        duck = self._attack(self._release(self._duck_amount(mono)))
+        frame_gain = self.bg_volume + (self.duck_volume - self.bg_volume) * duck
+
+        # Ramp linearly from the previous frame's gain (continuous across calls).
+        starts = np.concatenate([[self._last_gain], frame_gain[:-1]])
+        ramp = np.arange(1, self.hop + 1, dtype=np.float64) / self.hop
+        per_sample = starts[:, None] + (frame_gain - starts)[:, None] * ramp
+        self._last_gain = float(frame_gain[-1])
+        return per_sample.ravel()[: len(mono)].astype(np.float32)
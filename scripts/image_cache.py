@@ -0,0 +1,123 @@
+# scripts/image_cache.py
+"""
+Cache of decoded, cover-fitted slideshow images.
+
+Each entry is the part of an image a Ken Burns slide can ever show (centre
+crop visible at the smallest zoom), resampled to the resolution of the
+largest zoom, as an RGB uint8 .npy that later renders memory-map instead of
+decoding and resizing the source again. Entries are keyed by image content
+hash, canvas size, overscan, zoom range and resampling filter, and the
+directory is size-bounded with least-recently-used eviction.
+
+Cold loads shrink while decoding where the format allows it (JPEG draft mode
+decodes at 1/2–1/8 scale) and reduce by integer factors before the final
+resample, so the working set follows the output size, not the source size.
+"""
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+from scripts.cache_utils import CACHE_ROOT, PathLike, enforce_size_limit, file_sha256, key_sha256, touch
+
+COVER_CACHE_DIR = CACHE_ROOT / "cover_images"
+COVER_CACHE_MAX_BYTES = 4 * 1024**3  # 4 GB
+COVER_RESAMPLE = "lanczos"
+PIL_RESAMPLE = {
+    "nearest": Image.NEAREST,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC,
+    "lanczos": Image.LANCZOS,
+}
+REDUCING_GAP = 3.0  # integer pre-reduction (Image.reduce) before the final resample
+
+
+def cover_fit(
+    path: PathLike,
+    target_w: int,
+    target_h: int,
+    overscan: float,
+    zoom_floor: float = 1.0,
+    zoom_ceiling: float = 1.0,
+    resample: str = COVER_RESAMPLE,
+) -> np.ndarray:
+    """
+    Decode `path` to the (h, w, 3) uint8 region visible at zoom >= zoom_floor
+    of a cover fit (× overscan) on a target_w × target_h canvas, at the pixel
+    scale of zoom_ceiling.
+    """
+    with Image.open(path) as im:
+        w, h = im.size
+        scale = max(target_w / w, target_h / h) * overscan * zoom_ceiling
+        # Visible region in scaled pixels, then in source pixels
+        vw = min(w * scale, target_w * zoom_ceiling / zoom_floor)
+        vh = min(h * scale, target_h * zoom_ceiling / zoom_floor)
+        out_size = (max(1, math.ceil(vw)), max(1, math.ceil(vh)))
+
+        # Let the decoder downscale (JPEG: DCT scaling) when we need fewer pixels
+        im.draft("RGB", (max(1, math.ceil(w * scale)), max(1, math.ceil(h * scale))))
+        sx, sy = im.size[0] / w, im.size[1] / h  # draft may have shrunk the image
+        box = (
+            (w - vw / scale) / 2 * sx,
+            (h - vh / scale) / 2 * sy,
+            (w + vw / scale) / 2 * sx,
+            (h + vh / scale) / 2 * sy,
+        )
+        img = im.convert("RGB").resize(out_size, PIL_RESAMPLE[resample], box=box, reducing_gap=REDUCING_GAP)
+    return np.asarray(img, dtype=np.uint8)
+
+
+class CoverImageCache:
+    def __init__(
+        self,
+        root: PathLike = COVER_CACHE_DIR,
+        max_bytes: int = COVER_CACHE_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(
+        image_hash: str,
+        size: Tuple[int, int],
+        overscan: float,
+        zoom_floor: float,
+        zoom_ceiling: float,
+        resample: str = COVER_RESAMPLE,
+    ) -> str:
+        return key_sha256("cover-image-v1", image_hash, *size, overscan, zoom_floor, zoom_ceiling, resample)
+
+    def get(
+        self,
+        path: PathLike,
+        target_w: int,
+        target_h: int,
+        overscan: float,
+        zoom_floor: float = 1.0,
+        zoom_ceiling: float = 1.0,
+        resample: str = COVER_RESAMPLE,
+    ) -> np.ndarray:
+        """Read-only memmap of the cover-fitted image; decodes and stores it on a miss."""
+        key = self.key(file_sha256(path), (target_w, target_h), overscan, zoom_floor, zoom_ceiling, resample)
+        entry = self.root / f"{key}.npy"
+        if entry.exists():
+            try:
+                arr = np.load(entry, mmap_mode="r")
+                touch(entry)
+                return arr
+            except (OSError, ValueError):
+                pass  # unreadable/partial entry: rebuild it
+
+        arr = cover_fit(path, target_w, target_h, overscan, zoom_floor, zoom_ceiling, resample)
+        tmp = self.root / f"{key}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp, entry)  # atomic: readers never see a partial file
+        enforce_size_limit(self.root, self.max_bytes, "*.npy")
+        return np.load(entry, mmap_mode="r")
@@ -0,0 +1,139 @@
+# scripts/kenburns.py
+"""
+NumPy/PIL Ken Burns frame generator for build_video (backend "numpy").
+
+Renders a scripts.build_video.Timeline frame by frame without MoviePy
+compositing:
+  - each image is decoded and resampled once, at the resolution of its
+    maximum zoom, and cropped to the region the zoom ever shows (shared
+    with the MoviePy path through scripts/image_cache.py);
+  - a frame is one PIL resize of a float (subpixel) box of that image
+    straight to the canvas size, copied into a reused output buffer;
+  - crossfades and global fades are vectorized blends done only on the
+    frames that actually overlap/fade (every other frame is a plain copy).
+
+Only the slides on screen (at most two) are kept prepared.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from scripts.build_video import SlideshowParams, Timeline, zoom_at, zoom_end
+from scripts.image_cache import PIL_RESAMPLE, CoverImageCache
+
+
+class _PreparedSlide:
+    def __init__(self, path, idx: int, p: SlideshowParams):
+        z_lo = min(p.zoom_start, zoom_end(idx, p))
+        self.z_max = max(p.zoom_start, zoom_end(idx, p))
+        # Cover fit at the largest zoom's resolution, cropped to what the zoom shows
+        pixels = CoverImageCache().get(
+            path, p.target_w, p.target_h, p.overscan, z_lo, self.z_max, p.cover_resample
+        )
+        if (p.lum != 0.0) or (abs(p.contrast - 1.0) > 1e-6):
+            arr = np.asarray(pixels, dtype=np.float32)
+            arr = arr + p.lum + p.contrast * (arr - 128.0)  # vfx.LumContrast curve
+            pixels = np.clip(arr, 0, 255).astype(np.uint8)
+        self.image = Image.fromarray(np.ascontiguousarray(pixels))
+        # Per-frame crop + scale (≤ max zoom ratio, near 1:1): bilinear is plenty
+        self.resample = PIL_RESAMPLE[p.frame_resample]
+
+    def render(self, z: float, size) -> Image.Image:
+        """Canvas-sized view at zoom z: centred subpixel box, one resize."""
+        iw, ih = self.image.size
+        rw, rh = size[0] * self.z_max / z, size[1] * self.z_max / z
+        box = ((iw - rw) / 2, (ih - rh) / 2, (iw + rw) / 2, (ih + rh) / 2)
+        return self.image.resize(size, self.resample, box=box)
+
+
+class KenBurnsSource:
+    """
+    Frame source for a planned Timeline. `frame(n)` returns frame n as a
+    (H, W, 3) uint8 array; the array is reused, so consume it before asking
+    for the next one. `make_frame(t)` is the MoviePy VideoClip callback.
+    """
+
+    def __init__(self, timeline: Timeline, p: SlideshowParams):
+        self.timeline = timeline
+        self.p = p
+        self.size = (p.target_w, p.target_h)
+        fps = timeline.fps
+        self._starts = [int(round(s.start * fps)) for s in timeline.slides]
+        self._lengths = [int(round(s.duration * fps)) for s in timeline.slides]
+        self._xfade_frames = int(round(timeline.xfade * fps))
+        self._fade_in_frames = timeline.fade_in * fps
+        self._fade_out_frames = timeline.fade_out * fps
+        self._end_frame = int(round(timeline.video_end * fps))
+
+        self._prepared: Dict[int, _PreparedSlide] = {}
+        self._out = np.zeros((p.target_h, p.target_w, 3), dtype=np.uint8)
+        self._acc = np.empty((p.target_h, p.target_w, 3), dtype=np.float32)
+        self._tmp = np.empty_like(self._acc)
+
+    @property
+    def frame_count(self) -> int:
+        return self.timeline.frame_count
+
+    def _slide(self, i: int) -> _PreparedSlide:
+        if i not in self._prepared:
+            # Frames are requested (mostly) in order: drop slides already behind us.
+            for j in [j for j in self._prepared if j < i - 1 or j > i + 1]:
+                del self._prepared[j]
+            s = self.timeline.slides[i]
+            self._prepared[i] = _PreparedSlide(s.path, s.index, self.p)
+        return self._prepared[i]
+
+    def _view(self, i: int, n: int) -> np.ndarray:
+        s = self.timeline.slides[i]
+        local_t = (n - self._starts[i]) / self.timeline.fps
+        return np.asarray(self._slide(i).render(zoom_at(local_t, s.duration, s.index, self.p), self.size))
+
+    def _active(self, n: int) -> List[int]:
+        return [
+            i for i, (st, ln) in enumerate(zip(self._starts, self._lengths)) if st <= n < st + ln
+        ]
+
+    def _fade_gain(self, n: int) -> Optional[float]:
+        g = 1.0
+        if n < self._fade_in_frames:
+            g = min(g, n / self._fade_in_frames)
+        if n >= self._end_frame - self._fade_out_frames:
+            g = min(g, max(0.0, (self._end_frame - n) / self._fade_out_frames))
+        return g if g < 1.0 else None
+
+    def frame(self, n: int) -> np.ndarray:
+        # Past the last slide (audio a frame longer): hold the final frame, like tpad clone.
+        n_src = min(n, self._end_frame - 1)
+        active = self._active(n_src) or [len(self.timeline.slides) - 1]
+        gain = self._fade_gain(n_src)
+
+        if len(active) == 1 and gain is None:
+            self._out[...] = self._view(active[0], n_src)
+            return self._out
+
+        np.copyto(self._acc, self._view(active[0], n_src))
+        if len(active) > 1:
+            # Incoming slide fades in linearly over the crossfade (CrossFadeIn)
+            b = active[1]
+            alpha = (n_src - self._starts[b]) / max(self._xfade_frames, 1)
+            np.copyto(self._tmp, self._view(b, n_src))
+            self._tmp -= self._acc
+            self._tmp *= alpha
+            self._acc += self._tmp
+        if gain is not None:
+            self._acc *= gain
+        self._acc += 0.5
+        np.copyto(self._out, self._acc, casting="unsafe")
+        return self._out
+
+    def iter_frames(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator[np.ndarray]:
+        """Timeline frames start, start+step, … (step > 1: lower output fps, same timing)."""
+        stop = self.frame_count if stop is None else stop
+        for n in range(start, stop, step):
+            yield self.frame(n)
+
+    def make_frame(self, t: float) -> np.ndarray:
+        return self.frame(min(int(round(t * self.timeline.fps)), self.frame_count - 1))
@@ -0,0 +1,174 @@
+# scripts/local_worker.py
+"""
+Tiny local request/response transport for long-lived model workers.
+
+A worker listens on a Unix socket (POSIX) or on a 127.0.0.1 port (Windows)
+and answers framed messages: one JSON header line followed by an optional
+binary payload of ``header["payload_bytes"]`` bytes. A request may produce
+several response frames; the last one carries ``"done": true``.
+
+Each connection gets its own thread, so a second client is never stuck
+behind the first one's open socket; requests that touch the model still run
+one at a time. A ``ping`` is answered without waiting for the model, and the
+client only waits CONNECT_TIMEOUT for it: a worker that doesn't answer counts
+as no worker, and callers fall back to an in-process model.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Union
+
+Address = Union[str, Tuple[str, int]]
+Frame = Tuple[dict, bytes]
+Handler = Callable[[dict, bytes], Iterable[Frame]]
+
+CONNECT_TIMEOUT = 2.0  # seconds; connect + ping, to probe whether a worker is up
+
+
+def default_address(name: str, port: int) -> Address:
+    """Unix socket in the temp dir where supported, else a loopback TCP port."""
+    if hasattr(socket, "AF_UNIX") and os.name != "nt":
+        return os.path.join(tempfile.gettempdir(), f"video-generator-{name}.sock")
+    return ("127.0.0.1", port)
+
+
+# ==================== FRAMING ====================
+def write_frame(wfile, header: dict, payload: bytes = b"") -> None:
+    header = dict(header, payload_bytes=len(payload))
+    wfile.write(json.dumps(header).encode("utf-8") + b"\n")
+    if payload:
+        wfile.write(payload)
+    wfile.flush()
+
+
+def read_frame(rfile) -> Optional[Frame]:
+    """Read one frame; returns None on a clean EOF."""
+    line = rfile.readline()
+    if not line:
+        return None
+    header = json.loads(line.decode("utf-8"))
+    size = int(header.get("payload_bytes", 0))
+    payload = rfile.read(size) if size else b""
+    if len(payload) != size:
+        raise ConnectionError("Worker connection closed mid-frame.")
+    return header, payload
+
+
+# ==================== SERVER ====================
+def serve(address: Address, handler: Handler) -> None:
+    """
+    Serve requests until interrupted: one thread per connection, but one
+    request at a time (models are not thread-safe); pings skip the queue.
+    `handler(header, payload)` yields response frames; `done` is set on the last.
+    """
+    model_lock = threading.Lock()
+
+    class _RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            while True:
+                frame = read_frame(self.rfile)
+                if frame is None:
+                    return
+                header, payload = frame
+                lock = model_lock if header.get("op") != "ping" else nullcontext()
+                try:
+                    with lock:
+                        # Hold one frame back so the last one can be marked `done`.
+                        pending: Frame = ({"ok": True}, b"")
+                        for i, frame in enumerate(handler(header, payload)):
+                            if i:
+                                write_frame(self.wfile, dict(pending[0], done=False), pending[1])
+                            pending = frame
+                        write_frame(self.wfile, dict(pending[0], done=True), pending[1])
+                except Exception as e:
+                    write_frame(self.wfile, {"ok": False, "error": str(e), "done": True})
+
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.remove(address)  # stale socket from a previous run
+        server = socketserver.ThreadingUnixStreamServer(address, _RequestHandler, bind_and_activate=False)
+    else:
+        server = socketserver.ThreadingTCPServer(address, _RequestHandler, bind_and_activate=False)
+        server.allow_reuse_address = True
+    server.daemon_threads = True  # don't wait for idle clients on shutdown
+    server.server_bind()
+    server.server_activate()
+
+    print(f"🟢 Worker listening on: {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if isinstance(address, str) and os.path.exists(address):
+            os.remove(address)
+
+
+# ==================== CLIENT ====================
+class WorkerClient:
+    """Persistent connection to a worker; one request in flight at a time."""
+
+    def __init__(self, sock: socket.socket):
+        self.info: dict = {}  # the worker's ping reply, set by connect()
+        self._sock = sock
+        self._rfile = sock.makefile("rb")
+        self._wfile = sock.makefile("wb")
+
+    def stream(self, header: dict, payload: bytes = b"") -> Iterator[Frame]:
+        """Send one request and yield its response frames as they arrive."""
+        write_frame(self._wfile, header, payload)
+        while True:
+            frame = read_frame(self._rfile)
+            if frame is None:
+                raise ConnectionError("Worker closed the connection.")
+            resp_header, resp_payload = frame
+            if not resp_header.get("ok", False):
+                raise RuntimeError(f"Worker error: {resp_header.get('error')}")
+            yield resp_header, resp_payload
+            if resp_header.get("done"):
+                return
+
+    def request(self, header: dict, payload: bytes = b"") -> Frame:
+        """Send one request and return its final response frame."""
+        frame: Frame = ({}, b"")
+        for frame in self.stream(header, payload):
+            pass
+        return frame
+
+    def close(self) -> None:
+        for f in (self._rfile, self._wfile, self._sock):
+            try:
+                f.close()
+            except Exception:
+                pass
+
+
+def connect(address: Address, timeout: float = CONNECT_TIMEOUT) -> Optional[WorkerClient]:
+    """Connect to a running worker; returns None when nothing is listening."""
+    if isinstance(address, str):
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(address):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        return None
+    client = WorkerClient(sock)
+    try:
+        client.info, _ = client.request({"op": "ping"})  # still under `timeout`
+    except (OSError, ValueError, RuntimeError):
+        client.close()
+        return None
+    sock.settimeout(None)  # synthesis can take a while; block on replies
+    return client
@@ -1,16 +1,19 @@
 # scripts/mix_audio.py
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
 from typing import Optional
 
-from moviepy import AudioFileClip, CompositeAudioClip, afx
+import numpy as np
+import soundfile as sf
 
-# Optional loop FX (present in most installs). If unavailable, we fall back gracefully.
-try:
-    from moviepy.audio.fx.all import audio_loop  # v1/v2 compatible import path
-except Exception:
-    audio_loop = None
+from scripts.audio_io import StreamResampler, decode_audio, stream_audio, upmix
+from scripts.audio_stream import AudioChunk
+from scripts.ducking import DUCK_VOLUME, Ducker
+from scripts.loudness import LoudnessMeter, TruePeakMeter
+from scripts.music_library import MusicLibrary
 
 # ===== Defaults (edit as you like) =====
 MAIN_PATH   = Path("assets/audio/generated/output.wav")   # primary/narration
@@ -22,27 +25,217 @@ BG_VOLUME   = 0.20   # 20%
 TARGET      = "main" # "main" = match main length, "max" = longest
 STRATEGY    = "cut"  # "cut" or "loop"
 SAMPLE_RATE = 48000  # 48 kHz is video-friendly
+USE_MUSIC_LIBRARY = True  # read background PCM from the decoded-track cache
+DUCKING     = False  # True = music dips to DUCK_VOLUME under narration (one render)
+NORMALIZE   = False  # True = measure + correct loudness before writing (no ffmpeg loudnorm)
+TARGET_LUFS = -14.0  # integrated loudness target (EBU R128 / BS.1770 gating)
+TRUE_PEAK_DBTP = -1.0  # true-peak ceiling; normalization gain is capped to respect it
+STREAMING   = False  # True = mix in fixed-size blocks (memory independent of length)
+BLOCK_SECONDS = 2.0  # block size for STREAMING
 
 
-def _apply_volume_v2(clip: AudioFileClip, factor: float):
+def _fit(track: np.ndarray, frames: int, loop: bool) -> np.ndarray:
+    """Cut, zero-pad, or (loop=True) repeat a track to exactly `frames`."""
+    n = len(track)
+    if n >= frames:
+        return track[:frames]
+    if loop and n > 0:
+        reps = -(-frames // n)  # ceil
+        return np.tile(track, (reps, 1))[:frames]
+    out = np.zeros((frames, track.shape[1]), dtype=track.dtype)
+    out[:n] = track
+    return out
+
+
+def _bg_block(track: np.ndarray, start: int, n: int, loop: bool) -> np.ndarray:
+    """Frames [start, start+n) of a track under the same cut/pad/loop rules as _fit."""
+    length = len(track)
+    if loop and length > 0:
+        return np.asarray(track[(start + np.arange(n)) % length], dtype=np.float32)
+    out = np.zeros((n, track.shape[1]), dtype=np.float32)
+    part = track[start : start + n]
+    out[: len(part)] = part
+    return out
+
+
+class BlockMixer:
     """
-    MoviePy v2 way to set volume: apply audio effect via with_effects + afx.MultiplyVolume.
-    This works on AudioClip and VideoClip audio alike.
+    Mixes narration into a background track block by block, so peak memory
+    depends on the block size rather than on the length of the audio. The
+    background is read lazily (a library memmap only pages in what is used),
+    the ducking gain and loudness meters carry their state across blocks, and
+    each mixed block is written out straight away.
+
+    With normalize=True the mix goes to a float temp file while it is metered;
+    finish() then streams it once more, applying the single corrective gain
+    into the final 16-bit file. The 16-bit file is itself written next to
+    out_path and swapped in by finish(); abort() removes both temp files.
     """
-    return clip.with_effects([afx.MultiplyVolume(factor)])
 
+    def __init__(
+        self,
+        bg: np.ndarray,
+        out_path: Path,
+        main_volume: float = MAIN_VOLUME,
+        bg_volume: float = BG_VOLUME,
+        target: str = TARGET,
+        strategy: str = STRATEGY,
+        sample_rate: int = SAMPLE_RATE,
+        duck: bool = DUCKING,
+        duck_volume: float = DUCK_VOLUME,
+        normalize: bool = NORMALIZE,
+        target_lufs: float = TARGET_LUFS,
+        true_peak_dbtp: float = TRUE_PEAK_DBTP,
+        block_seconds: float = BLOCK_SECONDS,
+    ):
+        self.bg = bg
+        self.out_path = Path(out_path)
+        self.channels = bg.shape[1]
+        self.main_volume = np.float32(main_volume)
+        self.bg_volume = np.float32(bg_volume)
+        self.target = target
+        self.loop = strategy == "loop"
+        self.sample_rate = sample_rate
+        self.normalize = normalize
+        self.target_lufs = target_lufs
+        self.true_peak_dbtp = true_peak_dbtp
+
+        self.ducker = Ducker(sample_rate, bg_volume, duck_volume) if duck else None
+        # Whole ducking frames per block, so the gain curve is the same as one pass.
+        hop = self.ducker.hop if self.ducker else 1
+        self.block_frames = max(hop, int(round(block_seconds * sample_rate)) // hop * hop)
+
+        self._pending = np.zeros((self.block_frames, self.channels), dtype=np.float32)
+        self._filled = 0
+        self.frames_written = 0
+
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.out_path.with_name(f"{self.out_path.stem}.{os.getpid()}.mixtmp.wav")
+        self._part_path = self.out_path.with_name(f"{self.out_path.stem}.{os.getpid()}.part.wav")
+        if normalize:
+            self._loudness = LoudnessMeter(sample_rate, self.channels)
+            self._peak = TruePeakMeter(self.channels)
+            self._file = sf.SoundFile(str(self._tmp_path), "w", sample_rate, self.channels, subtype="FLOAT")
+        else:
+            self._file = sf.SoundFile(str(self._part_path), "w", sample_rate, self.channels, subtype="PCM_16")
+
+    def feed(self, main: np.ndarray) -> None:
+        """Narration frames, (frames, channels) float32, any length."""
+        main = np.asarray(main, dtype=np.float32).reshape(-1, self.channels)
+        while len(main):
+            take = min(len(main), self.block_frames - self._filled)
+            self._pending[self._filled : self._filled + take] = main[:take]
+            self._filled += take
+            main = main[take:]
+            if self._filled == self.block_frames:
+                self._mix(self._pending)
+                self._filled = 0
 
-def _apply_volume_compat(clip: AudioFileClip, factor: float):
+    def _mix(self, main: np.ndarray) -> None:
+        n = len(main)
+        gain = self.ducker.gain(main)[:, None] if self.ducker else self.bg_volume
+        block = _bg_block(self.bg, self.frames_written, n, self.loop)
+        block *= gain
+        block += main * self.main_volume
+        if self.normalize:
+            self._loudness.feed(block)
+            self._peak.feed(block)
+        else:
+            np.clip(block, -1.0, 1.0, out=block)
+        self._file.write(block)
+        self.frames_written += n
+
+    def finish(self) -> Path:
+        """Flush the last partial block (padding to the music for target="max") and close."""
+        if self.target == "max":
+            total = self.frames_written + self._filled
+            remaining = len(self.bg) - total
+            if remaining > 0:
+                silence = np.zeros((self.block_frames, self.channels), dtype=np.float32)
+                while remaining > 0:
+                    k = min(remaining, self.block_frames)
+                    self.feed(silence[:k])
+                    remaining -= k
+        if self._filled:
+            self._mix(self._pending[: self._filled])
+            self._filled = 0
+        self._file.close()
+
+        if self.normalize:
+            report = _normalization_gain(
+                self._loudness.integrated(), self._peak.finish(), self.target_lufs, self.true_peak_dbtp
+            )
+            gain = np.float32(10 ** (report["gain_db"] / 20))
+            try:
+                with sf.SoundFile(str(self._tmp_path)) as src, sf.SoundFile(
+                    str(self._part_path), "w", self.sample_rate, self.channels, subtype="PCM_16"
+                ) as dst:
+                    for block in src.blocks(blocksize=self.block_frames, dtype="float32", always_2d=True):
+                        block *= gain
+                        np.clip(block, -1.0, 1.0, out=block)
+                        dst.write(block)
+            finally:
+                self._tmp_path.unlink(missing_ok=True)
+        os.replace(self._part_path, self.out_path)
+        if self.normalize:
+            _write_report(self.out_path, report)
+        return self.out_path
+
+    def abort(self) -> None:
+        """Drop a mix that will not be finished; out_path is left as it was."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+        self._part_path.unlink(missing_ok=True)
+
+
+class MixConsumer:
     """
-    Compatibility: prefer v2 effect; if someone runs v1 where effects aren't available the same way,
-    try volumex if it exists.
+    AudioConsumer (scripts/audio_stream.py) that mixes streamed TTS straight
+    into the background music: chunks are resampled to the mix rate as they
+    arrive, so the narration WAV never has to be read back.
     """
-    try:
-        return _apply_volume_v2(clip, factor)
-    except Exception:
-        if hasattr(clip, "volumex"):  # v1 dynamic method
-            return clip.volumex(factor)
-        raise
+
+    def __init__(self, mixer: BlockMixer):
+        self.mixer = mixer
+        self._resampler: Optional[StreamResampler] = None
+
+    def _stereo(self, mono: np.ndarray) -> np.ndarray:
+        # Same mono → stereo gain as the ffmpeg decode in run(), so levels and ducking match.
+        return upmix(mono, self.mixer.channels)
+
+    def feed(self, chunk: AudioChunk) -> None:
+        if self._resampler is None:
+            self._resampler = StreamResampler(chunk.sample_rate, self.mixer.sample_rate)
+        self.mixer.feed(self._stereo(self._resampler.feed(chunk.samples)))
+
+    def close(self) -> None:
+        if self._resampler is not None:
+            self.mixer.feed(self._stereo(self._resampler.flush()))
+        self.mixer.finish()
+        print(f"🎚️ Streamed mix saved to: {self.mixer.out_path}")
+
+    def abort(self) -> None:
+        self.mixer.abort()
+
+
+def _background(bg_path: Path, sample_rate: int, use_library: bool) -> np.ndarray:
+    if use_library:
+        return MusicLibrary().get(bg_path, sample_rate).pcm  # memory-mapped, no decode
+    return decode_audio(bg_path, sample_rate)
+
+
+def mix_consumer(
+    bg_path: Path = BG_PATH,
+    out_path: Path = OUT_PATH,
+    sample_rate: int = SAMPLE_RATE,
+    use_library: bool = USE_MUSIC_LIBRARY,
+    **mixer_kwargs,
+) -> MixConsumer:
+    """MixConsumer for generate_audio_from_json(stream=True, consumers=[...])."""
+    if not bg_path.exists():
+        raise FileNotFoundError(f"Background audio not found: {bg_path}")
+    bg = _background(bg_path, sample_rate, use_library)
+    return MixConsumer(BlockMixer(bg, out_path, sample_rate=sample_rate, **mixer_kwargs))
 
 
 def mix_audio(
@@ -54,9 +247,26 @@ def mix_audio(
     target: str = TARGET,
     strategy: str = STRATEGY,
     sample_rate: int = SAMPLE_RATE,
+    use_library: bool = USE_MUSIC_LIBRARY,
+    duck: bool = DUCKING,
+    duck_volume: float = DUCK_VOLUME,
+    normalize: bool = NORMALIZE,
+    target_lufs: float = TARGET_LUFS,
+    true_peak_dbtp: float = TRUE_PEAK_DBTP,
+    streaming: bool = STREAMING,
+    block_seconds: float = BLOCK_SECONDS,
 ) -> Path:
     """
     Mix two audio files (main + background@bg_volume) and save to out_path.
+    Both tracks are decoded once to float32 at sample_rate; gain, cut/loop and
+    the sum are whole-array NumPy ops and the mix is written in one pass.
+    With streaming=True the narration is decoded and mixed in block_seconds
+    blocks instead (BlockMixer), for long-form audio on small machines.
+    With duck=True the background gain follows the narration (bg_volume when
+    it is quiet, duck_volume while it speaks) instead of staying flat.
+    With normalize=True the mix is measured as it is produced and a single
+    corrective gain brings it to target_lufs (capped by true_peak_dbtp)
+    before the one write; measurements go to <out>.loudness.json.
     Returns the written file path.
     """
     if not main_path.exists():
@@ -66,37 +276,83 @@ def mix_audio(
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    main_clip = bg_clip = mixed = None
-    try:
-        main_clip = _apply_volume_compat(AudioFileClip(str(main_path)), main_volume)
-        bg_clip   = _apply_volume_compat(AudioFileClip(str(bg_path)),   bg_volume)
+    bg = _background(bg_path, sample_rate, use_library)
+    if streaming:
+        mixer = BlockMixer(
+            bg, out_path, main_volume, bg_volume, target, strategy, sample_rate,
+            duck, duck_volume, normalize, target_lufs, true_peak_dbtp, block_seconds,
+        )
+        try:
+            for block in stream_audio(main_path, sample_rate, bg.shape[1], mixer.block_frames):
+                mixer.feed(block)
+        except BaseException:
+            mixer.abort()
+            raise
+        return mixer.finish()
 
-        # Decide target duration
-        if target == "max":
-            final_duration = max(float(main_clip.duration), float(bg_clip.duration))
-        else:
-            final_duration = float(main_clip.duration)
+    main = decode_audio(main_path, sample_rate)
 
-        # Fit durations
-        main_clip = main_clip.with_duration(final_duration)
+    # Decide target length
+    if target == "max":
+        frames = max(len(main), len(bg))
+    else:
+        frames = len(main)
 
-        if strategy == "loop" and bg_clip.duration < final_duration and audio_loop:
-            bg_clip = audio_loop(bg_clip, duration=final_duration)
-        else:
-            bg_clip = bg_clip.with_duration(final_duration)
+    # Fit lengths, apply gains and sum in place (no per-chunk callbacks)
+    if duck:
+        ducker = Ducker(sample_rate, bg_volume, duck_volume)
+        bg_gain = ducker.gain(_fit(main, frames, loop=False))[:, None]
+    else:
+        bg_gain = np.float32(bg_volume)
+    mixed = _fit(bg, frames, loop=(strategy == "loop")) * bg_gain
+    mixed[: min(len(main), frames)] += main[:frames] * np.float32(main_volume)
 
-        # Mix and export
-        mixed = CompositeAudioClip([bg_clip, main_clip]).with_duration(final_duration)
-        mixed.write_audiofile(str(out_path), fps=sample_rate)
-        return out_path
+    if normalize:
+        loudness = LoudnessMeter(sample_rate, mixed.shape[1])
+        peak = TruePeakMeter(mixed.shape[1])
+        loudness.feed(mixed)
+        peak.feed(mixed)
+        report = _normalization_gain(loudness.integrated(), peak.finish(), target_lufs, true_peak_dbtp)
+        mixed *= np.float32(10 ** (report["gain_db"] / 20))
+        _write_report(out_path, report)
 
-    finally:
-        for clip in (mixed, main_clip, bg_clip):
-            try:
-                if clip is not None:
-                    clip.close()
-            except Exception:
-                pass
+    np.clip(mixed, -1.0, 1.0, out=mixed)
+    sf.write(str(out_path), mixed, sample_rate, subtype="PCM_16")
+    return out_path
+
+
+def _normalization_gain(lufs: float, tp: float, target_lufs: float, ceiling_dbtp: float) -> dict:
+    """Gain (dB) that reaches target_lufs without pushing the true peak over the ceiling."""
+    if not np.isfinite(lufs):
+        gain = 0.0  # silence: nothing to normalize
+    else:
+        gain = target_lufs - lufs
+    peak_limited = bool(np.isfinite(tp) and tp + gain > ceiling_dbtp)
+    if peak_limited:
+        gain = ceiling_dbtp - tp
+
+    def finite(v: float) -> Optional[float]:
+        return round(float(v), 2) if np.isfinite(v) else None
+
+    return {
+        "input_lufs": finite(lufs),
+        "input_true_peak_dbtp": finite(tp),
+        "target_lufs": target_lufs,
+        "true_peak_ceiling_dbtp": ceiling_dbtp,
+        "gain_db": round(float(gain), 2),
+        "output_lufs": finite(lufs + gain),
+        "output_true_peak_dbtp": finite(tp + gain),
+        "peak_limited": peak_limited,
+    }
+
+
+def _write_report(out_path: Path, report: dict) -> None:
+    print(
+        f"🔈 Loudness: {report['input_lufs']} LUFS / {report['input_true_peak_dbtp']} dBTP → "
+        f"{report['output_lufs']} LUFS / {report['output_true_peak_dbtp']} dBTP "
+        f"(gain {report['gain_db']:+.2f} dB{', peak-limited' if report['peak_limited'] else ''})"
+    )
+    out_path.with_suffix(".loudness.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
 
 
 def run() -> Path:
@@ -110,6 +366,12 @@ def run() -> Path:
         target=TARGET,
         strategy=STRATEGY,
         sample_rate=SAMPLE_RATE,
+        duck=DUCKING,
+        normalize=NORMALIZE,
+        target_lufs=TARGET_LUFS,
+        true_peak_dbtp=TRUE_PEAK_DBTP,
+        streaming=STREAMING,
+        block_seconds=BLOCK_SECONDS,
     )
 
 
@@ -0,0 +1,105 @@
+# scripts/music_library.py
+"""
+Decoded background-music library.
+
+The same few tracks back thousands of videos, so each one is decoded and
+resampled once and stored as a raw float32 .npy that later runs memory-map
+(zero-copy, no ffmpeg). An index.json keyed by file content hash, sample rate
+and channel count holds duration, integrated loudness, peak and an RMS
+envelope (.npy) for every entry.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from scripts.audio_io import decode_audio
+from scripts.cache_utils import CACHE_ROOT, PathLike, file_sha256
+from scripts.loudness import integrated_loudness, peak_dbfs, rms_envelope
+
+MUSIC_CACHE_DIR = CACHE_ROOT / "music"
+ENVELOPE_HOP_S = 0.1
+
+
+@dataclass
+class MusicTrack:
+    source: str
+    sha256: str
+    sample_rate: int
+    pcm: np.ndarray  # read-only memmap, (frames, channels) float32
+    duration_s: float
+    lufs: Optional[float]  # None for digital silence
+    peak_dbfs: Optional[float]
+    rms_envelope: np.ndarray  # one RMS value per ENVELOPE_HOP_S
+    envelope_hop_s: float
+
+
+class MusicLibrary:
+    def __init__(self, root: PathLike = MUSIC_CACHE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.json"
+
+    def _load_index(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_entry(self, key: str, entry: dict) -> None:
+        index = self._load_index()  # re-read: another run may have added tracks
+        index[key] = entry
+        tmp = self.index_path.with_name(f"index.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, indent=2), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def _open(self, entry: dict, sha: str) -> MusicTrack:
+        return MusicTrack(
+            source=entry["source"],
+            sha256=sha,
+            sample_rate=entry["sample_rate"],
+            pcm=np.load(self.root / entry["pcm"], mmap_mode="r"),
+            duration_s=entry["duration_s"],
+            lufs=entry["lufs"],
+            peak_dbfs=entry["peak_dbfs"],
+            rms_envelope=np.load(self.root / entry["envelope"]),
+            envelope_hop_s=entry["envelope_hop_s"],
+        )
+
+    def get(self, path: PathLike, sample_rate: int, channels: int = 2) -> MusicTrack:
+        """Cached track for `path` at `sample_rate`; decodes and indexes on first use."""
+        sha = file_sha256(path)
+        key = f"{sha}-{sample_rate}-{channels}"
+        entry = self._load_index().get(key)
+        if entry and (self.root / entry["pcm"]).exists() and (self.root / entry["envelope"]).exists():
+            return self._open(entry, sha)
+
+        print(f"🎼 Decoding into music library: {path}")
+        pcm = decode_audio(Path(path), sample_rate, channels)
+        pcm_name, env_name = f"{key}.pcm.npy", f"{key}.rms.npy"
+        for name, arr in ((pcm_name, pcm), (env_name, rms_envelope(pcm, sample_rate, ENVELOPE_HOP_S))):
+            tmp = self.root / f"{name}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, self.root / name)
+
+        lufs = integrated_loudness(pcm, sample_rate)
+        entry = {
+            "source": str(path),
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "frames": int(len(pcm)),
+            "duration_s": len(pcm) / float(sample_rate),
+            "lufs": lufs if np.isfinite(lufs) else None,
+            "peak_dbfs": peak_dbfs(pcm),
+            "envelope_hop_s": ENVELOPE_HOP_S,
+            "pcm": pcm_name,
+            "envelope": env_name,
+        }
+        self._save_entry(key, entry)
+        return self._open(entry, sha)
@@ -1,150 +1,421 @@
 from __future__ import annotations
+
+import json
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Union
 
+import numpy as np
 
-def generate_subtitles() -> Path:
-    import os
-    import re
-    import json
-    from typing import List
-    from pydub import AudioSegment
-    import whisperx  # type: ignore
+from scripts.align_parallel import ALIGN_PROCESSES, align_parallel
+from scripts.align_segments import (
+    ALIGN_SAMPLE_RATE,
+    load_align_audio,
+    merge_words,
+    segment_jobs,
+    sentence_segments,
+)
 
-    # --- Prevent Windows crash ---
-    os.environ["TRANSFORMERS_NO_TORCHVISION"] = "1"
-    os.environ["TORCHVISION_DISABLE_NMS_EXPORT"] = "1"
+PathLike = Union[str, Path]
 
-    # --- Default Paths ---
-    models_root = Path("models").resolve()
-    json_path = Path("assets/info/story_image_prompts.json")
-    audio_path = Path("assets/audio/generated/output.wav")
-    ass_out_path = Path("assets/subtitles/output.ass")
+# --- Default Paths ---
+MODELS_ROOT = Path("models")
+JSON_PATH = Path("assets/info/story_image_prompts.json")
+AUDIO_PATH = Path("assets/audio/generated/output.wav")
+ASS_OUT_PATH = Path("assets/subtitles/output.ass")
+ALIGN_CHECKPOINT = "wav2vec2_fairseq_base_ls960_asr_ls960.pth"  # under models/hub/checkpoints
+USE_TIMING_CACHE = True  # reuse word timings while audio, text and model are unchanged
+STREAM_ALIGN = False  # True = windowed alignment with bounded memory (hour-long narration)
+TIMING_ENGINE = "whisperx"  # "approx" = length-weighted split snapped to energy minima (drafts, no model)
 
-    # --- Load story text ---
-    if not json_path.exists():
-        raise FileNotFoundError(f"JSON file not found: {json_path}")
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+# --- Subtitle appearance defaults (visuals only) ---
+PLAYRES_W = 1080
+PLAYRES_H = 1920
+FONT = "DejaVu Sans Mono"
+FONTSIZE = 54
+PRIMARY_COLOR = "&H00FFFFFF"  # white (unused by inline, kept for completeness)
+OUTLINE_COLOR = "&H00000000"  # black (unused by inline, kept for completeness)
+ALIGNMENT = 5  # 5 = top-center (use 2 for bottom-center)
+MARGIN_L = 60
+MARGIN_R = 60
+MARGIN_V = 40
 
-    story_lines = data.get("story", [])
-    if not story_lines or not isinstance(story_lines, list):
-        raise ValueError(f"'story' key missing or empty in {json_path}")
-    text_to_align = " ".join(line.strip() for line in story_lines if line.strip())
-
-    # --- Check model checkpoint ---
-    ckpt = (
-        models_root
-        / "hub"
-        / "checkpoints"
-        / "wav2vec2_fairseq_base_ls960_asr_ls960.pth"
-    )
-    if not ckpt.exists():
-        raise FileNotFoundError(f"Missing alignment checkpoint: {ckpt}")
-
-    os.environ["TORCH_HOME"] = str(models_root)
-    os.environ["HF_HUB_OFFLINE"] = "1"
-    os.environ["TRANSFORMERS_OFFLINE"] = "1"
-
-    # --- Subtitle appearance defaults (visuals only) ---
-    playres_w = 1080
-    playres_h = 1920
-    font = "DejaVu Sans Mono"
-    fontsize = 54
-    primary_color = "&H00FFFFFF"  # white (unused by inline, kept for completeness)
-    outline_color = "&H00000000"  # black (unused by inline, kept for completeness)
-    alignment = 5  # 5 = top-center (use 2 for bottom-center)
-    margin_l = 60
-    margin_r = 60
-    margin_v = 40
-
-    # Inline overrides (match your sample exactly)
-    inline_fs = 84
-    inline_prefix = (
-        r"{\b1\fs" + str(inline_fs) + r"\1c&HFFFFFF&\3c&H000000&\bord4\shad0}"
+# Inline overrides (match your sample exactly)
+INLINE_FS = 84
+
+
+# ==================== ASS HELPERS ====================
+def fmt_time(t: float) -> str:
+    if t < 0:
+        t = 0.0
+    h = int(t // 3600)
+    m = int((t % 3600) // 60)
+    s = int(t % 60)
+    cs = int(round((t - int(t)) * 100))
+    if cs >= 100:
+        cs = 0
+        s += 1
+        if s >= 60:
+            s = 0
+            m += 1
+            if m >= 60:
+                m = 0
+                h += 1
+    return f"{h}:{m:02}:{s:02}.{cs:02}"
+
+
+def esc(text: str) -> str:
+    return (
+        text.replace("\\", r"\\")
+        .replace("{", r"\{")
+        .replace("}", r"\}")
+        .replace("\n", r"\N")
     )
 
-    # --- Prepare audio and segments ---
-    ass_out_path.parent.mkdir(parents=True, exist_ok=True)
-    duration_s = AudioSegment.from_file(audio_path).duration_seconds
-    segments = [{"start": 0.0, "end": duration_s, "text": text_to_align}]
-
-    # --- Align text with WhisperX (UNTOUCHED loading behavior) ---
-    align_model, metadata = whisperx.load_align_model(language_code="en", device="cpu")
-    aligned = whisperx.align(segments, align_model, metadata, str(audio_path), "cpu")
-
-    # --- Helpers ---
-    def fmt_time(t: float) -> str:
-        if t < 0:
-            t = 0.0
-        h = int(t // 3600)
-        m = int((t % 3600) // 60)
-        s = int(t % 60)
-        cs = int(round((t - int(t)) * 100))
-        if cs >= 100:
-            cs = 0
-            s += 1
-            if s >= 60:
-                s = 0
-                m += 1
-                if m >= 60:
-                    m = 0
-                    h += 1
-        return f"{h}:{m:02}:{s:02}.{cs:02}"
-
-    def esc(text: str) -> str:
-        return (
-            text.replace("\\", r"\\")
-            .replace("{", r"\{")
-            .replace("}", r"\}")
-            .replace("\n", r"\N")
-        )
-
-    # Remove ONLY trailing punctuation (keep internal apostrophes etc.)
-    # You mentioned "(, . ! etc)" — here’s a broad but end-only set.
-    trailing_punct_re = re.compile(r"""[)\]\}\.,!?:;'"“”‘’\-–—…]+$""")
-
-    def strip_trailing_punct(token: str) -> str:
-        return trailing_punct_re.sub("", token)
-
-    # --- ASS file header (single style 'HL'; actual look via inline overrides) ---
-    header = (
+
+# Remove ONLY trailing punctuation (keep internal apostrophes etc.)
+# You mentioned "(, . ! etc)" — here’s a broad but end-only set.
+_TRAILING_PUNCT_RE = re.compile(r"""[)\]\}\.,!?:;'"“”‘’\-–—…]+$""")
+
+
+def strip_trailing_punct(token: str) -> str:
+    return _TRAILING_PUNCT_RE.sub("", token)
+
+
+def ass_header() -> str:
+    """ASS file header (single style 'HL'; actual look via inline overrides)."""
+    return (
         "[Script Info]\n"
         "ScriptType: v4.00+\n"
         "WrapStyle: 2\n"
-        f"PlayResX:{playres_w}\n"
-        f"PlayResY:{playres_h}\n\n"
+        f"PlayResX:{PLAYRES_W}\n"
+        f"PlayResY:{PLAYRES_H}\n\n"
         "[V4+ Styles]\n"
         "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
         "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, "
         "Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
         # Keep a simple HL style; inline tags will override size/color/bold/outline.
-        f"Style: HL,{font},{fontsize},{primary_color},&H000000FF,{outline_color},&H00000000,"
-        f"0,0,0,0,100,100,0,0,1,3,0,{alignment},{margin_l},{margin_r},{margin_v},1\n\n"
+        f"Style: HL,{FONT},{FONTSIZE},{PRIMARY_COLOR},&H000000FF,{OUTLINE_COLOR},&H00000000,"
+        f"0,0,0,0,100,100,0,0,1,3,0,{ALIGNMENT},{MARGIN_L},{MARGIN_R},{MARGIN_V},1\n\n"
         "[Events]\n"
         "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
     )
 
-    lines: List[str] = [header]
-
-    # --- WORD-LEVEL ONLY: one Dialogue per word, with inline styling and no trailing punctuation ---
-    for seg in aligned.get("segments", []):
-        for w in seg.get("words", []):
-            if w.get("start") is None or w.get("end") is None:
-                continue
-            raw = str(w.get("word", "")).strip()
-            if not raw:
-                continue
-            token = strip_trailing_punct(raw).upper()
-            if not token:
-                # token was only punctuation at the end; skip
-                continue
-            lines.append(
-                f"Dialogue: 1,{fmt_time(float(w['start']))},{fmt_time(float(w['end']))},HL,,"
-                f"{margin_l},{margin_r},{margin_v},,"
-                f"{inline_prefix}{esc(token)}\n"
-            )
-
-    ass_out_path.write_text("".join(lines), encoding="utf-8")
+
+def ass_dialogue(word: dict) -> Optional[str]:
+    """One Dialogue line for an aligned word (inline styling, no trailing punctuation)."""
+    if word.get("start") is None or word.get("end") is None:
+        return None
+    raw = str(word.get("word", "")).strip()
+    if not raw:
+        return None
+    token = strip_trailing_punct(raw).upper()
+    if not token:
+        # token was only punctuation at the end; skip
+        return None
+    inline_prefix = r"{\b1\fs" + str(INLINE_FS) + r"\1c&HFFFFFF&\3c&H000000&\bord4\shad0}"
+    return (
+        f"Dialogue: 1,{fmt_time(float(word['start']))},{fmt_time(float(word['end']))},HL,,"
+        f"{MARGIN_L},{MARGIN_R},{MARGIN_V},,"
+        f"{inline_prefix}{esc(token)}\n"
+    )
+
+
+def build_ass(words: Sequence[dict]) -> str:
+    """WORD-LEVEL ONLY: one Dialogue per word, after the header."""
+    lines: List[str] = [ass_header()]
+    for w in words:
+        line = ass_dialogue(w)
+        if line is not None:
+            lines.append(line)
+    return "".join(lines)
+
+
+class AssWriter:
+    """
+    Incremental build_ass(): header on open, Dialogue lines as words arrive.
+    Lines go to a temp file that replaces `path` only on a successful close,
+    so a failed alignment never leaves a header-only track behind.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self._tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self._f = open(self._tmp, "w", encoding="utf-8")
+        self._f.write(ass_header())
+
+    def write(self, words: Sequence[dict]) -> None:
+        for w in words:
+            line = ass_dialogue(w)
+            if line is not None:
+                self._f.write(line)
+
+    def close(self) -> None:
+        self._f.close()
+        os.replace(self._tmp, self.path)  # atomic: readers never see a partial file
+
+    def abort(self) -> None:
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# ==================== ALIGNMENT ====================
+@dataclass
+class AlignJob:
+    audio: Union[PathLike, np.ndarray]  # file, or mono float32 at ALIGN_SAMPLE_RATE
+    segments: List[dict]  # [{"start", "end", "text"}] in seconds, relative to `audio`
+    tag: str = ""  # caller's label, echoed in logs
+    offset: float = 0.0  # where `audio` starts in the full narration (seconds)
+    words: List[dict] = field(default_factory=list)  # filled by align_batch
+
+
+def load_story_text(json_path: PathLike = JSON_PATH) -> str:
+    json_path = Path(json_path)
+    if not json_path.exists():
+        raise FileNotFoundError(f"JSON file not found: {json_path}")
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    story_lines = data.get("story", [])
+    if not story_lines or not isinstance(story_lines, list):
+        raise ValueError(f"'story' key missing or empty in {json_path}")
+    return " ".join(line.strip() for line in story_lines if line.strip())
+
+
+def story_segments(audio_path: PathLike, wav: np.ndarray, text: str) -> List[dict]:
+    """Sentence spans to align: the TTS timing manifest if valid, else silence detection on `wav`."""
+    from scripts.audio_manifest import manifest_segments_s, read_manifest
+
+    # Prefer the TTS timing manifest: exact per-segment bounds, no guessing.
+    manifest = read_manifest(audio_path)
+    if manifest is not None:
+        return manifest_segments_s(manifest)
+    return sentence_segments(wav, ALIGN_SAMPLE_RATE, text)
+
+
+def words_of(aligned: dict) -> List[dict]:
+    """Flatten whisperx.align output to [{"word", "start", "end"}] in order."""
+    return [
+        {"word": w.get("word", ""), "start": w.get("start"), "end": w.get("end")}
+        for seg in aligned.get("segments", [])
+        for w in seg.get("words", [])
+    ]
+
+
+def align_model_id(language: str = "en", models_root: PathLike = MODELS_ROOT) -> str:
+    """Identity of the align model, from its checkpoint file alone (nothing is loaded)."""
+    ckpt = Path(models_root).resolve() / "hub" / "checkpoints" / ALIGN_CHECKPOINT
+    size = ckpt.stat().st_size if ckpt.exists() else 0
+    return f"whisperx-align:{language}:{ckpt.name}:{size}"
+
+
+class WhisperXAligner:
+    """
+    wav2vec2 forced aligner loaded once and kept resident: the whisperx/torch
+    import and checkpoint load happen in __init__, every align call after
+    that only runs the model.
+    """
+
+    def __init__(self, language: str = "en", device: str = "cpu", models_root: PathLike = MODELS_ROOT):
+        # --- Prevent Windows crash ---
+        os.environ["TRANSFORMERS_NO_TORCHVISION"] = "1"
+        os.environ["TORCHVISION_DISABLE_NMS_EXPORT"] = "1"
+
+        models_root = Path(models_root).resolve()
+        # --- Check model checkpoint ---
+        ckpt = models_root / "hub" / "checkpoints" / ALIGN_CHECKPOINT
+        if not ckpt.exists():
+            raise FileNotFoundError(f"Missing alignment checkpoint: {ckpt}")
+
+        os.environ["TORCH_HOME"] = str(models_root)
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+        import whisperx  # type: ignore
+
+        self._whisperx = whisperx
+        self.language = language
+        self.device = device
+        # (UNTOUCHED loading behavior)
+        self.model, self.metadata = whisperx.load_align_model(language_code=language, device=device)
+        self.model_id = align_model_id(language, models_root)
+
+    def align(self, audio, segments: Sequence[dict]) -> List[dict]:
+        """Word timings for `segments` of `audio` (path or mono float32 at ALIGN_SAMPLE_RATE)."""
+        if not isinstance(audio, str) and isinstance(audio, os.PathLike):
+            audio = str(audio)
+        aligned = self._whisperx.align(list(segments), self.model, self.metadata, audio, self.device)
+        return words_of(aligned)
+
+    def align_batch(self, jobs: Sequence[AlignJob]) -> List[AlignJob]:
+        """Align many (audio, text) jobs back to back on the resident model."""
+        for n, job in enumerate(jobs, 1):
+            job.words = self.align(job.audio, job.segments)
+            print(f"   🔤 [{n}/{len(jobs)}] {job.tag or f'job {n}'}: {len(job.words)} words")
+        return list(jobs)
+
+
+_aligner: Optional[WhisperXAligner] = None  # resident per process
+
+
+def align_worker(language: str = "en"):
+    """
+    A new connection to the running align worker if it serves `language`,
+    else None. The caller closes it when done: the socket is not kept open
+    across calls.
+    """
+    from scripts.align_worker import connect_worker
+
+    worker = connect_worker()
+    if worker is None:
+        return None
+    if worker.language != language:
+        print(f"⚠️ Alignment worker serves {worker.language!r}, not {language!r}; not using it.")
+        worker.close()
+        return None
+    print("♻️ Using running alignment worker (model already loaded).")
+    return worker
+
+
+def get_aligner(language: str = "en") -> WhisperXAligner:
+    """This process's resident aligner (loaded on first use)."""
+    global _aligner
+    if _aligner is None or _aligner.language != language:
+        _aligner = WhisperXAligner(language=language)
+    return _aligner
+
+
+@contextmanager
+def open_aligner(aligner=None, language: str = "en", fallback=get_aligner):
+    """
+    `aligner` if given; else a connection to the running align worker, closed
+    on exit; else `fallback(language)` (the resident aligner, or None).
+    """
+    if aligner is not None:
+        yield aligner
+        return
+    worker = align_worker(language)
+    if worker is None:
+        yield fallback(language) if fallback else None
+        return
+    try:
+        yield worker
+    finally:
+        worker.close()
+
+
+def align_words(
+    audio_path: PathLike, text: str, aligner=None, processes: int = ALIGN_PROCESSES
+) -> List[dict]:
+    """
+    Word timings for the narration, aligned sentence by sentence: on `aligner`
+    if given, else a running align worker, else `processes` worker processes
+    (or the resident in-process aligner when processes == 1).
+    """
+    wav = load_align_audio(audio_path)
+    jobs = segment_jobs(wav, ALIGN_SAMPLE_RATE, story_segments(audio_path, wav, text))
+    del wav  # jobs hold their own slices
+
+    with open_aligner(aligner, fallback=None) as aligner:
+        if aligner is None and processes > 1 and len(jobs) > 1:
+            return merge_words(align_parallel(jobs, processes=processes))
+        jobs = (aligner or get_aligner()).align_batch(jobs)
+    return merge_words(jobs)
+
+
+def approx_word_timings(audio_path: PathLike, text: str) -> List[dict]:
+    """Model-free word timings: each sentence span split by word length (scripts/approx_timing.py)."""
+    from scripts.approx_timing import approx_words
+
+    wav = load_align_audio(audio_path)
+    return approx_words(wav, ALIGN_SAMPLE_RATE, story_segments(audio_path, wav, text))
+
+
+def word_timings(
+    audio_path: PathLike,
+    text: str,
+    aligner=None,
+    use_cache: bool = USE_TIMING_CACHE,
+    stream: bool = STREAM_ALIGN,
+    sink: Optional[Callable[[List[dict]], None]] = None,
+    engine: str = TIMING_ENGINE,
+) -> List[dict]:
+    """
+    Aligned words from the timing cache, aligning (and storing) only on a miss.
+    `sink` receives words as they become available: all at once, or window by
+    window when `stream` is set (whisperx engine only).
+    """
+    from scripts.approx_timing import approx_model_id
+    from scripts.cache_utils import file_sha256
+    from scripts.timing_cache import WordTimingCache
+
+    if engine not in ("whisperx", "approx"):
+        raise ValueError(f"Unknown timing engine: {engine!r}")
+    sink = sink or (lambda words: None)
+    cache = WordTimingCache() if use_cache else None
+    if cache is not None:
+        if engine == "approx":
+            model_id = approx_model_id()
+        else:
+            model_id = aligner.model_id if aligner is not None else align_model_id()
+        mode = "stream" if stream and engine == "whisperx" else "sentence"
+        key = cache.key(file_sha256(audio_path), text, model_id, mode)
+        words = cache.load(key)
+        if words is not None:
+            print(f"♻️ Word timings from cache ({len(words)} words, no alignment).")
+            sink(words)
+            return words
+
+    if engine == "approx":
+        words = approx_word_timings(audio_path, text)
+        print(f"   ⚡ approximate timings for {len(words)} words (no alignment model)")
+        sink(words)
+    elif stream:
+        from scripts.align_stream import stream_word_timings
+
+        words = []
+        with open_aligner(aligner) as aligner:
+            for batch in stream_word_timings(audio_path, text, aligner):
+                sink(batch)
+                words.extend(batch)
+        print(f"   🔤 streamed {len(words)} words")
+    else:
+        words = align_words(audio_path, text, aligner)
+        sink(words)
+    if cache is not None:
+        cache.store(key, words)
+    return words
+
+
+# ==================== PUBLIC API (writes file) ====================
+def generate_subtitles(
+    audio_path: PathLike = AUDIO_PATH,
+    json_path: PathLike = JSON_PATH,
+    ass_out_path: PathLike = ASS_OUT_PATH,
+    aligner=None,
+    stream: bool = STREAM_ALIGN,
+    engine: str = TIMING_ENGINE,
+) -> Path:
+    audio_path, ass_out_path = Path(audio_path), Path(ass_out_path)
+    text_to_align = load_story_text(json_path)
+    ass_out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Restyling only changes the ASS writer: cached timings skip the model entirely.
+    with AssWriter(ass_out_path) as ass:
+        word_timings(audio_path, text_to_align, aligner, stream=stream, sink=ass.write, engine=engine)
+
     print(
         f"✅ Word-level subtitles written (no trailing punctuation): {ass_out_path.resolve()}"
     )
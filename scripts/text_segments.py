@@ -0,0 +1,100 @@
+# scripts/text_segments.py
+"""
+Length-aware segmentation between `load_sentences` and synthesis.
+
+Very short lines waste XTTS per-call overhead; very long ones run past its
+comfortable window (the English tokenizer warns above ~250 chars), which is
+slower and drifts more. Over-long lines are split at clause boundaries, and
+every segment records which story lines it came from.
+
+Packing tiny neighbours into one call is opt-in (PACK_LINES): a packed
+segment is cached as a whole, so editing one line — or changing its length,
+which moves every later packing boundary — re-synthesizes its neighbours
+too, and the pause between packed lines disappears from the audio and the
+timing manifest.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+# ===== Defaults (see benchmarks/bench_segment_rtf.py) =====
+MAX_SEGMENT_CHARS = 220  # split lines longer than this
+TARGET_SEGMENT_CHARS = 150  # pack short neighbours up to this
+MIN_SEGMENT_CHARS = 40  # segments shorter than this always try to pack
+PACK_LINES = False  # True = pack short neighbouring lines into one XTTS call
+
+# Strongest boundary first: sentence ends, then clause punctuation, then spaces.
+_BOUNDARIES = (
+    re.compile(r"(?<=[.!?…])\s+"),
+    re.compile(r"(?<=[;:])\s+|\s+(?=[—–]\s)|(?<=[—–])\s+"),
+    re.compile(r"(?<=,)\s+"),
+    re.compile(r"\s+"),
+)
+
+
+@dataclass
+class Segment:
+    text: str
+    lines: List[int] = field(default_factory=list)  # story line indices, in order
+    starts_line: bool = True  # False for the 2nd+ piece of a split line
+
+
+def split_long(text: str, max_chars: int = MAX_SEGMENT_CHARS, level: int = 0) -> List[str]:
+    """Split `text` into pieces ≤ max_chars, preferring the strongest boundary."""
+    if len(text) <= max_chars or level >= len(_BOUNDARIES):
+        return [text]
+    parts = [p for p in _BOUNDARIES[level].split(text) if p]
+    if len(parts) == 1:
+        return split_long(text, max_chars, level + 1)
+
+    # Greedily re-join parts at this level, recursing into any that are still too long.
+    pieces: List[str] = []
+    current = ""
+    for part in parts:
+        candidate = f"{current} {part}" if current else part
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        if len(part) > max_chars:
+            pieces.extend(split_long(part, max_chars, level + 1))
+            current = ""
+        else:
+            current = part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def segment_lines(
+    lines: Sequence[str],
+    max_chars: int = MAX_SEGMENT_CHARS,
+    target_chars: int = TARGET_SEGMENT_CHARS,
+    min_chars: int = MIN_SEGMENT_CHARS,
+    pack: bool = PACK_LINES,
+) -> List[Segment]:
+    """Split over-long lines, then (if `pack`) pack tiny neighbours; keeps the line mapping."""
+    pieces: List[Tuple[str, int, bool]] = []
+    for i, line in enumerate(lines):
+        for k, piece in enumerate(split_long(line, max_chars)):
+            pieces.append((piece, i, k == 0))
+    if not pack:
+        return [Segment(text, [line_idx], first) for text, line_idx, first in pieces]
+
+    segments: List[Segment] = []
+    for text, line_idx, first in pieces:
+        prev = segments[-1] if segments else None
+        merged_len = len(prev.text) + 1 + len(text) if prev else 0
+        packable = prev is not None and merged_len <= max_chars and (
+            merged_len <= target_chars or len(prev.text) < min_chars or len(text) < min_chars
+        )
+        if packable:
+            prev.text = f"{prev.text} {text}"
+            if prev.lines[-1] != line_idx:
+                prev.lines.append(line_idx)
+        else:
+            segments.append(Segment(text, [line_idx], first))
+    return segments
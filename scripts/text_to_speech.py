@@ -1,7 +1,23 @@
 # scripts/text_to_speech.py
-from TTS.api import TTS
-from pydub import AudioSegment
-import os, time, json, glob
+import os, json
+
+import numpy as np
+import soundfile as sf
+
+from scripts.audio_cache import SentenceAudioCache
+from scripts.audio_manifest import ManifestWriter, write_manifest
+from scripts.audio_stream import AudioChunk, WavWriter, pump
+from scripts.cache_utils import CACHE_ROOT, file_sha256, key_sha256
+from scripts.text_segments import Segment, segment_lines, split_long
+from scripts.tts_quant import is_quantized, quantize_xtts
+from scripts.tts_parallel import (
+    TTS_PROCESSES,
+    SynthJob,
+    SynthResult,
+    report_rtf,
+    synthesize_job,
+    synthesize_parallel,
+)
 
 # -------------------------------
 # 🔧 Paths you can change if needed
@@ -13,11 +29,20 @@ SPEAKER_WAV = (
 )
 OUTPUT_DIR = r"assets/audio/generated"
 OUTPUT_FILE = r"assets/audio/generated/output.wav"
-CHUNKS_DIR = os.path.join(OUTPUT_DIR, "chunks")
+INTER_SENTENCE_SILENCE_S = 10000 / 24000  # pause between lines (what tts_to_file used to pad)
+CLAUSE_SILENCE_S = 0.12  # pause where an over-long line was split
+SEGMENT_TEXT = True  # split over-long lines for XTTS (packing: text_segments.PACK_LINES)
+QUANTIZE_INT8 = False  # CPU only: dynamic int8 GPT/decoder (see benchmarks/bench_int8.py)
+STREAM_TTS = False  # True = hand audio downstream while later lines still synthesize
+STREAM_CHUNK_TOKENS = 20  # XTTS GPT tokens per streamed piece (smaller = lower latency)
+STREAM_PIECES = False  # True = pass on sub-line pieces (lower latency, but not peak-normalized)
+LATENT_CACHE_DIR = os.path.join(CACHE_ROOT, "speaker_latents")
 
 
-def load_tts(model_path=MODEL_PATH, gpu=False):
-    """Load the XTTS v2 model."""
+def load_tts(model_path=MODEL_PATH, gpu=False, quantize=QUANTIZE_INT8):
+    """Load the XTTS v2 model (optionally int8-quantized for CPU inference)."""
+    from TTS.api import TTS  # heavy (torch); only needed when no worker is running
+
     print(f"⏳ Loading XTTS v2 model from: {model_path}")
     tts = TTS(
         model_path=model_path,
@@ -25,9 +50,169 @@ def load_tts(model_path=MODEL_PATH, gpu=False):
         gpu=gpu,
     )
     print("✅ Model loaded.\n")
+    if quantize and not gpu:
+        quantize_xtts(tts, model_fingerprint(model_path))
     return tts
 
 
+def model_fingerprint(model_path=MODEL_PATH, quantized=False):
+    """Cheap model identity: config hash + checkpoint size (hashing GBs is too slow)."""
+    parts = [file_sha256(os.path.join(model_path, "config.json"))]
+    ckpt = os.path.join(model_path, "model.pth")
+    if os.path.exists(ckpt):
+        parts.append(os.path.getsize(ckpt))
+    if quantized:
+        parts.append("int8")  # different weights → different audio and latents
+    return key_sha256(*parts)[:16]
+
+
+class XTTSEngine:
+    """In-process XTTS that computes speaker conditioning once per voice, not per sentence."""
+
+    def __init__(self, tts, model_path=MODEL_PATH):
+        self.tts = tts
+        self.model = tts.synthesizer.tts_model
+        self.model_id = model_fingerprint(model_path, quantized=is_quantized(self.model))
+        self._speaker_hashes = {}  # (path, mtime, size) -> content hash
+        self._latents = {}  # content hash -> (gpt_cond_latent, speaker_embedding)
+
+    def speaker_hash(self, speaker_wav):
+        st = os.stat(speaker_wav)
+        stamp = (os.path.abspath(speaker_wav), st.st_mtime_ns, st.st_size)
+        if stamp not in self._speaker_hashes:
+            self._speaker_hashes[stamp] = file_sha256(speaker_wav)
+        return self._speaker_hashes[stamp]
+
+    def speaker_latents(self, speaker_wav):
+        """GPT conditioning latents + speaker embedding, from memory, disk, or computed."""
+        import torch
+
+        speaker_hash = self.speaker_hash(speaker_wav)
+        if speaker_hash in self._latents:
+            return self._latents[speaker_hash]
+
+        cache_path = os.path.join(
+            LATENT_CACHE_DIR, f"{key_sha256(speaker_hash, self.model_id)[:32]}.pt"
+        )
+        device = next(self.model.parameters()).device
+        latents = None
+        if os.path.exists(cache_path):
+            try:
+                data = torch.load(cache_path, map_location=device, weights_only=True)
+                latents = (data["gpt_cond_latent"], data["speaker_embedding"])
+            except Exception:
+                latents = None  # unreadable entry: recompute and overwrite it
+        if latents is None:
+            print(f"🎙️ Computing speaker conditioning for: {speaker_wav}")
+            cfg = self.model.config
+            latents = self.model.get_conditioning_latents(
+                audio_path=[speaker_wav],
+                gpt_cond_len=cfg.gpt_cond_len,
+                gpt_cond_chunk_len=cfg.gpt_cond_chunk_len,
+                max_ref_length=cfg.max_ref_len,
+                sound_norm_refs=cfg.sound_norm_refs,
+            )
+            os.makedirs(LATENT_CACHE_DIR, exist_ok=True)
+            # Pool workers may all miss at once: each writes its own tmp, then swaps it in.
+            tmp = f"{cache_path}.{os.getpid()}.tmp"
+            torch.save(
+                {"gpt_cond_latent": latents[0].cpu(), "speaker_embedding": latents[1].cpu()},
+                tmp,
+            )
+            os.replace(tmp, cache_path)  # atomic: readers never see a partial file
+        self._latents[speaker_hash] = latents
+        return latents
+
+    @property
+    def sample_rate(self):
+        return self.tts.synthesizer.output_sample_rate
+
+    def synthesize(self, text, speaker_wav, language):
+        """
+        One line → float32 waveform in memory, reusing the cached conditioning.
+        Lines over XTTS's window are split first (as Synthesizer.tts did), so
+        this holds whatever SEGMENT_TEXT is set to.
+        """
+        gpt_cond_latent, speaker_embedding = self.speaker_latents(speaker_wav)
+        cfg = self.model.config
+        waves = []
+        for piece in split_long(text):
+            out = self.model.inference(
+                piece,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+                temperature=cfg.temperature,
+                length_penalty=cfg.length_penalty,
+                repetition_penalty=cfg.repetition_penalty,
+                top_k=cfg.top_k,
+                top_p=cfg.top_p,
+            )
+            waves.append(np.asarray(out["wav"], dtype=np.float32).reshape(-1))
+        wav, _ = concat_with_silence(waves, self.sample_rate, CLAUSE_SILENCE_S)
+        return peak_normalize(wav)
+
+    def stream(self, text, speaker_wav, language):
+        """
+        Yield float32 pieces of one line as XTTS produces them. Pieces are not
+        peak-normalized: the line's peak is unknown until it has finished.
+        """
+        gpt_cond_latent, speaker_embedding = self.speaker_latents(speaker_wav)
+        if not hasattr(self.model, "inference_stream"):
+            yield self.synthesize(text, speaker_wav, language)
+            return
+        cfg = self.model.config
+        for k, part in enumerate(split_long(text)):  # same splitting as synthesize()
+            if k:
+                yield np.zeros(int(round(CLAUSE_SILENCE_S * self.sample_rate)), dtype=np.float32)
+            for piece in self.model.inference_stream(
+                part,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+                stream_chunk_size=STREAM_CHUNK_TOKENS,
+                temperature=cfg.temperature,
+                length_penalty=cfg.length_penalty,
+                repetition_penalty=cfg.repetition_penalty,
+                top_k=cfg.top_k,
+                top_p=cfg.top_p,
+            ):
+                yield piece.detach().cpu().numpy().astype(np.float32).reshape(-1)
+
+
+def peak_normalize(wav):
+    """Per-line peak normalization, as Synthesizer.save_wav did for every chunk."""
+    wav = np.asarray(wav, dtype=np.float32).reshape(-1)
+    return wav / max(0.01, float(np.max(np.abs(wav), initial=0.0)))
+
+
+def concat_with_silence(waves, sample_rate, gaps_s=INTER_SENTENCE_SILENCE_S):
+    """
+    Join segments into one preallocated buffer (linear, unlike repeated `+`).
+    `gaps_s` is one pause length or one per boundary (len(waves) - 1).
+    Returns (buffer, [(start_sample, end_sample) per wave]).
+    """
+    if np.isscalar(gaps_s):
+        gaps_s = [gaps_s] * max(0, len(waves) - 1)
+    gaps = [int(round(g * sample_rate)) for g in gaps_s]
+    total = sum(len(w) for w in waves) + sum(gaps)
+    out = np.zeros(total, dtype=np.float32)  # gaps are already silent
+    spans = []
+    pos = 0
+    for k, w in enumerate(waves):
+        if k:
+            pos += gaps[k - 1]
+        out[pos : pos + len(w)] = w
+        spans.append((pos, pos + len(w)))
+        pos += len(w)
+    return out, spans
+
+
+def pause_before(segment):
+    """Silence inserted before a segment: full pause between lines, short at splits."""
+    return INTER_SENTENCE_SILENCE_S if segment.starts_line else CLAUSE_SILENCE_S
+
+
 def load_sentences(json_path=JSON_PATH, key="story"):
     """Read sentences from JSON; default key = 'story'."""
     if not os.path.exists(json_path):
@@ -45,52 +230,160 @@ def load_sentences(json_path=JSON_PATH, key="story"):
     return sentences
 
 
-def ensure_dirs():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    os.makedirs(CHUNKS_DIR, exist_ok=True)
-
+def load_segments(json_path=JSON_PATH, key="story", segment=SEGMENT_TEXT):
+    """Story lines as synthesis segments (over-long lines split when `segment` is on)."""
+    sentences = load_sentences(json_path, key=key)
+    if not segment:
+        return [Segment(s, [i]) for i, s in enumerate(sentences)]
+    segments = segment_lines(sentences)
+    print(f"✂️ {len(sentences)} lines → {len(segments)} synthesis segments\n")
+    return segments
 
-def clean_chunks():
-    # optional: wipe old chunk_*.wav so we don't accidentally merge leftovers
-    for f in glob.glob(os.path.join(CHUNKS_DIR, "chunk_*.wav")):
-        try:
-            os.remove(f)
-        except OSError:
-            pass
 
+def ensure_dirs():
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def generate_audio_from_json():
-    """Main worker: load model, read JSON, synthesize, and merge."""
-    ensure_dirs()
-    clean_chunks()
 
+def _check_speaker():
     if not os.path.exists(SPEAKER_WAV):
         raise FileNotFoundError(
             f"Speaker reference not found: {SPEAKER_WAV}\n"
             f"→ place a sample voice WAV there (16k/22k/44.1k ok)."
         )
 
-    tts = load_tts(gpu=False)  # set True if you have a compatible GPU
-    sentences = load_sentences(JSON_PATH, key="story")
-
-    all_chunks = []
-    for i, sentence in enumerate(sentences, 1):
-        file_chunk = os.path.join(CHUNKS_DIR, f"chunk_{i}.wav")
-        print(f"🔊 [{i}/{len(sentences)}] {sentence}")
-        start = time.time()
-        tts.tts_to_file(
-            text=sentence,
-            speaker_wav=SPEAKER_WAV,
-            language="en",
-            file_path=file_chunk,
-        )
-        print(f"   ✅ done in {time.time() - start:.2f}s")
-        all_chunks.append(AudioSegment.from_wav(file_chunk))
 
-    if not all_chunks:
-        raise RuntimeError("No chunks produced — check JSON content.")
+def _connect_synthesizer():
+    """
+    Prefer a warm worker (scripts/tts_worker.py). Otherwise return None: the
+    model is loaded lazily, only once some line actually misses the cache.
+    """
+    from scripts.tts_worker import connect_worker
+
+    tts = connect_worker()
+    if tts is not None:
+        print("♻️ Using running XTTS worker (model already loaded).\n")
+    model_id = tts.model_id if tts is not None else model_fingerprint(MODEL_PATH, QUANTIZE_INT8)
+    return tts, model_id
+
+
+def stream_audio_from_json(language="en"):
+    """
+    Yield AudioChunk objects in story order as soon as each is ready, one per
+    line, peak-normalized exactly as the batch path and the cache store them.
+    With STREAM_PIECES, new lines are passed on piece by piece via XTTS
+    streaming inference instead; their peak is unknown until the line ends,
+    so those pieces are only clipped to ±1 and play at a different level
+    than later (cached) runs of the same line.
+    Feed them to consumers with scripts.audio_stream.pump().
+    """
+    _check_speaker()
+    segments = load_segments(JSON_PATH, key="story")
+    tts, model_id = _connect_synthesizer()
+    speaker_hash = file_sha256(SPEAKER_WAV)
+    cache = SentenceAudioCache()
+
+    sample_rate = None
+    for i, seg in enumerate(segments):
+        sentence = seg.text
+        if i and sample_rate:
+            gap = np.zeros(int(round(pause_before(seg) * sample_rate)), dtype=np.float32)
+            yield AudioChunk(None, gap, sample_rate)
+
+        print(f"🔊 [{i + 1}/{len(segments)}] {sentence}")
+        key = cache.key(sentence, speaker_hash, language, model_id)
+        cached = cache.load(key)
+        if cached is not None:
+            samples, sample_rate = cached
+            yield AudioChunk(i, samples, sample_rate, sentence, segment_end=True, lines=seg.lines)
+            continue
+
+        if tts is None:
+            tts = XTTSEngine(load_tts(gpu=False))  # set gpu=True if you have a compatible GPU
+        sample_rate = tts.sample_rate
+        if not STREAM_PIECES:
+            samples = tts.synthesize(sentence, SPEAKER_WAV, language)
+            cache.store(key, samples, sample_rate)
+            yield AudioChunk(i, samples, sample_rate, sentence, segment_end=True, lines=seg.lines)
+            continue
 
-    final_audio = sum(all_chunks)
-    final_audio.export(OUTPUT_FILE, format="wav")
-    clean_chunks()
-    print(f"\n🎧 Final audio saved to: {OUTPUT_FILE}")
+        # Hold one piece back so the final one can be flagged as segment_end.
+        pieces, held = [], None
+        for piece in tts.stream(sentence, SPEAKER_WAV, language):
+            if held is not None:
+                yield AudioChunk(i, np.clip(held, -1.0, 1.0), sample_rate, sentence, lines=seg.lines)
+            pieces.append(piece)
+            held = piece
+        last = np.clip(held, -1.0, 1.0) if held is not None else np.zeros(0, dtype=np.float32)
+        yield AudioChunk(i, last, sample_rate, sentence, segment_end=True, lines=seg.lines)
+        if pieces:
+            cache.store(key, peak_normalize(np.concatenate(pieces)), sample_rate)
+
+
+def generate_audio_from_json(stream=STREAM_TTS, consumers=()):
+    """
+    Main worker: read JSON, synthesize lines missing from the cache, and merge.
+    With stream=True, extra `consumers` (e.g. scripts.mix_audio.mix_consumer())
+    receive the narration alongside the WAV and manifest writers.
+    """
+    ensure_dirs()
+    if stream:
+        pump(stream_audio_from_json(), [WavWriter(OUTPUT_FILE), ManifestWriter(OUTPUT_FILE), *consumers])
+        print(f"\n🎧 Final audio saved to: {OUTPUT_FILE} (+ timing manifest)")
+        return
+
+    _check_speaker()
+    segments = load_segments(JSON_PATH, key="story")
+    sentences = [seg.text for seg in segments]
+    language = "en"
+    tts, model_id = _connect_synthesizer()
+    speaker_hash = file_sha256(SPEAKER_WAV)
+    cache = SentenceAudioCache()
+
+    # Pass 1: pull unchanged lines from the cache, collect the rest as jobs.
+    keys = [cache.key(sentence, speaker_hash, language, model_id) for sentence in sentences]
+    waves = [None] * len(sentences)
+    sample_rate = None
+    misses = []
+    for i, (sentence, key) in enumerate(zip(sentences, keys)):
+        cached = cache.load(key)
+        if cached is not None:
+            waves[i], sample_rate = cached
+        else:
+            misses.append(SynthJob(i, sentence))
+    print(f"♻️ {len(sentences) - len(misses)}/{len(sentences)} segments cached, {len(misses)} to synthesize\n")
+
+    # Pass 2: synthesize misses (warm worker, process pool, or in-process).
+    results: list[SynthResult] = []
+    if misses and tts is None and TTS_PROCESSES > 1 and len(misses) > 1:
+        results = synthesize_parallel(misses, SPEAKER_WAV, language, MODEL_PATH)
+    elif misses:
+        if tts is None:
+            tts = XTTSEngine(load_tts(gpu=False))  # set gpu=True if you have a compatible GPU
+        for n, job in enumerate(misses, 1):
+            print(f"🔊 [{n}/{len(misses)}] {job.text}")
+            r = synthesize_job(tts, job, SPEAKER_WAV, language)
+            print(f"   ✅ done in {r.synth_s:.2f}s (RTF {r.rtf:.2f})")
+            results.append(r)
+        report_rtf(results)
+
+    for r in results:
+        cache.store(keys[r.index], r.samples, r.sample_rate)
+        waves[r.index], sample_rate = r.samples, r.sample_rate
+
+    if not waves:
+        raise RuntimeError("No audio produced — check JSON content.")
+
+    final_audio, spans = concat_with_silence(
+        waves, sample_rate, [pause_before(seg) for seg in segments[1:]]
+    )
+    sf.write(OUTPUT_FILE, final_audio, sample_rate, subtype="PCM_16")
+    write_manifest(
+        OUTPUT_FILE,
+        sample_rate,
+        len(final_audio),
+        [
+            {"index": k, "text": seg.text, "lines": seg.lines, "start_sample": a, "end_sample": b}
+            for k, (seg, (a, b)) in enumerate(zip(segments, spans))
+        ],
+    )
+    print(f"\n🎧 Final audio saved to: {OUTPUT_FILE} (+ timing manifest)")
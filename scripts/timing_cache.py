@@ -0,0 +1,68 @@
+# scripts/timing_cache.py
+"""
+Content-addressed cache of aligned word timings.
+
+Entries are keyed by (narration audio hash, transcript text, alignment model
+identity, alignment mode) and hold just [word, start, end] rows, so
+restyling the subtitles (font, size, margins, ...) rebuilds the ASS from
+here without loading the aligner. The directory is size-bounded with least-recently-used eviction.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import List, Optional
+
+from scripts.cache_utils import CACHE_ROOT, PathLike, enforce_size_limit, key_sha256, touch
+
+TIMING_CACHE_DIR = CACHE_ROOT / "word_timings"
+TIMING_CACHE_MAX_BYTES = 256 * 1024**2  # 256 MB
+
+
+class WordTimingCache:
+    def __init__(
+        self,
+        root: PathLike = TIMING_CACHE_DIR,
+        max_bytes: int = TIMING_CACHE_MAX_BYTES,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(audio_hash: str, text: str, model_id: str, mode: str = "sentence") -> str:
+        """`mode`: how the words were aligned ("sentence" or "stream"); they time differently."""
+        return key_sha256("word-timings-v1", audio_hash, text, model_id, mode)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def load(self, key: str) -> Optional[List[dict]]:
+        """[{'word', 'start', 'end'}], marked as recently used; None on a miss."""
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        try:
+            rows = json.loads(path.read_text(encoding="utf-8"))["words"]
+        except (OSError, ValueError, KeyError):
+            return None  # unreadable/partial entry: treat as a miss
+        touch(path)
+        return [{"word": w, "start": s, "end": e} for w, s, e in rows]
+
+    def store(self, key: str, words: List[dict]) -> Path:
+        """Write aligned words at full precision (same ASS on reload), then trim to size."""
+        rows = [
+            [
+                w.get("word", ""),
+                None if w.get("start") is None else float(w["start"]),
+                None if w.get("end") is None else float(w["end"]),
+            ]
+            for w in words
+        ]
+        path = self.path_for(key)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"words": rows}, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)  # atomic: readers never see a partial file
+        enforce_size_limit(self.root, self.max_bytes, "*.json")
+        return path
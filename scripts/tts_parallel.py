@@ -0,0 +1,149 @@
+# scripts/tts_parallel.py
+"""
+Process-pool sentence synthesis.
+
+Each worker process loads its own XTTS copy with an explicit torch thread
+budget (intra-op threading scales poorly past a few threads on CPU, so
+several small workers beat one big one). Results come back in story order,
+with per-worker and aggregate real-time factor (RTF = synth time / audio
+time; lower is faster) so N can be tuned per machine.
+
+OMP/MKL/OpenBLAS read their thread counts once, when torch is first imported,
+and a spawned child imports the entry module before any initializer runs. So
+spawn_thread_env() sets them in the parent's environment while the pool
+starts (scripts/align_parallel.py uses it too).
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# ===== Defaults (edit per machine) =====
+TTS_PROCESSES = 1  # 1 = serial in-process synthesis
+TORCH_THREADS_PER_WORKER = 4
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+@dataclass
+class SynthJob:
+    index: int  # position in the story (results are reassembled by this)
+    text: str
+
+
+@dataclass
+class SynthResult:
+    index: int
+    pid: int
+    synth_s: float
+    samples: np.ndarray  # float32 mono
+    sample_rate: int
+
+    @property
+    def audio_s(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
+
+    @property
+    def rtf(self) -> float:
+        return self.synth_s / max(self.audio_s, 1e-6)
+
+
+def synthesize_job(engine, job: SynthJob, speaker_wav: str, language: str) -> SynthResult:
+    """Synthesize one job with any engine exposing `synthesize` and `sample_rate`."""
+    start = time.perf_counter()
+    samples = engine.synthesize(job.text, speaker_wav, language)
+    elapsed = time.perf_counter() - start
+    return SynthResult(job.index, os.getpid(), elapsed, samples, engine.sample_rate)
+
+
+def report_rtf(results: Sequence[SynthResult], wall_s: Optional[float] = None) -> None:
+    by_pid: Dict[int, List[SynthResult]] = defaultdict(list)
+    for r in results:
+        by_pid[r.pid].append(r)
+    for pid, rs in sorted(by_pid.items()):
+        synth = sum(r.synth_s for r in rs)
+        audio = sum(r.audio_s for r in rs)
+        print(f"   ⚙️ worker {pid}: {len(rs)} lines, {audio:.1f}s audio in {synth:.1f}s (RTF {synth / max(audio, 1e-6):.2f})")
+    synth = sum(r.synth_s for r in results)
+    audio = sum(r.audio_s for r in results)
+    print(f"   📊 aggregate: {audio:.1f}s audio, {synth:.1f}s synth (RTF {synth / max(audio, 1e-6):.2f})")
+    if wall_s is not None:
+        print(f"   ⏱️ wall: {wall_s:.1f}s (effective RTF {wall_s / max(audio, 1e-6):.2f}, incl. model loads)")
+
+
+# ==================== POOL ====================
+_engine = None  # one resident model per worker process
+
+
+@contextmanager
+def spawn_thread_env(threads: int) -> Iterator[None]:
+    """Native thread limits for children spawned inside the block; restored after."""
+    saved = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+    os.environ.update({var: str(threads) for var in THREAD_ENV_VARS})
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _init_worker(model_path: str, threads: int, gpu: bool) -> None:
+    # OMP/MKL/OpenBLAS limits come from the environment the parent spawned us with.
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already set in this process
+
+    from scripts.text_to_speech import XTTSEngine, load_tts
+
+    global _engine
+    _engine = XTTSEngine(load_tts(model_path, gpu=gpu), model_path)
+
+
+def _run_job(job: SynthJob, speaker_wav: str, language: str) -> SynthResult:
+    return synthesize_job(_engine, job, speaker_wav, language)
+
+
+def synthesize_parallel(
+    jobs: Sequence[SynthJob],
+    speaker_wav: str,
+    language: str,
+    model_path: str,
+    processes: int = TTS_PROCESSES,
+    threads_per_worker: int = TORCH_THREADS_PER_WORKER,
+    gpu: bool = False,
+) -> List[SynthResult]:
+    """Shard jobs across `processes` workers; returns results in story order."""
+    processes = max(1, min(processes, len(jobs)))
+    print(f"🧵 Synthesizing {len(jobs)} lines on {processes} processes × {threads_per_worker} torch threads")
+    start = time.perf_counter()
+    results: List[SynthResult] = []
+    ctx = multiprocessing.get_context("spawn")  # torch state must not be forked
+    with spawn_thread_env(threads_per_worker), ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(model_path, threads_per_worker, gpu),
+    ) as pool:
+        futures = [pool.submit(_run_job, job, speaker_wav, language) for job in jobs]
+        for done, fut in enumerate(as_completed(futures), 1):
+            r = fut.result()
+            print(f"   ✅ [{done}/{len(jobs)}] line {r.index + 1} in {r.synth_s:.2f}s (RTF {r.rtf:.2f})")
+            results.append(r)
+
+    results.sort(key=lambda r: r.index)
+    report_rtf(results, time.perf_counter() - start)
+    return results
@@ -0,0 +1,77 @@
+# scripts/tts_quant.py
+"""
+Opt-in dynamic int8 inference for XTTS on CPU.
+
+The GPT's transformer blocks use HF GPT-2 `Conv1D` projections, which
+`quantize_dynamic` does not recognise, so they are first rewritten as
+equivalent `nn.Linear` layers. Then every Linear in the GPT and the HiFi-GAN
+decoder is dynamically quantized to int8. The quantized modules are pickled
+under cache/xtts_int8 so the conversion is paid once per model + torch version.
+"""
+from __future__ import annotations
+
+import os
+
+from scripts.cache_utils import CACHE_ROOT, key_sha256
+
+QUANT_CACHE_DIR = CACHE_ROOT / "xtts_int8"
+
+
+def _conv1d_to_linear(module) -> int:
+    """Swap HF Conv1D (x @ W + b, W: in×out) for nn.Linear in place; returns count."""
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    swapped = 0
+    for name, child in list(module.named_children()):
+        if isinstance(child, Conv1D):
+            n_in, n_out = child.weight.shape
+            linear = torch.nn.Linear(n_in, n_out, bias=child.bias is not None)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                if child.bias is not None:
+                    linear.bias.copy_(child.bias)
+            setattr(module, name, linear)
+            swapped += 1
+        else:
+            swapped += _conv1d_to_linear(child)
+    return swapped
+
+
+def is_quantized(model) -> bool:
+    from torch.ao.nn.quantized.dynamic import Linear as QLinear
+
+    return any(isinstance(m, QLinear) for m in model.modules())
+
+
+def quantize_xtts(tts, model_id: str) -> None:
+    """Quantize (or load the cached int8 copy of) the GPT and decoder in place."""
+    import torch
+
+    model = tts.synthesizer.tts_model
+    if next(model.parameters()).is_cuda:
+        print("⚠️ int8 dynamic quantization is CPU-only; keeping float32 on GPU.")
+        return
+
+    QUANT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = QUANT_CACHE_DIR / f"{key_sha256(model_id, torch.__version__, 'dynamic-qint8-v1')[:32]}.pt"
+    if path.exists():
+        print(f"♻️ Loading cached int8 XTTS modules: {path}")
+        # Our own pickled modules (not a downloaded checkpoint), so full unpickling is fine.
+        parts = torch.load(path, map_location="cpu", weights_only=False)
+        model.gpt = parts["gpt"]
+        model.hifigan_decoder = parts["hifigan_decoder"]
+        return
+
+    print("⏳ Quantizing XTTS GPT + decoder linear layers to int8 (one-time)...")
+    # gpt.gpt_inference shares the transformer blocks, so in-place swaps reach it too.
+    swapped = _conv1d_to_linear(model.gpt)
+    for name in ("gpt", "hifigan_decoder"):
+        torch.ao.quantization.quantize_dynamic(
+            getattr(model, name), {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    # Cold pool workers may all quantize at once: each writes its own tmp, then swaps it in.
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    torch.save({"gpt": model.gpt, "hifigan_decoder": model.hifigan_decoder}, tmp)
+    os.replace(tmp, path)
+    print(f"✅ Quantized ({swapped} Conv1D → Linear); cached at: {path}")
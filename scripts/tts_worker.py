@@ -0,0 +1,95 @@
+# scripts/tts_worker.py
+"""
+Warm XTTS worker: loads MODEL_PATH once and serves sentence synthesis to
+local clients, so each video no longer pays the checkpoint load.
+
+Start it once per machine (from the project root):
+    python -m scripts.tts_worker
+`generate_audio_from_json()` uses it automatically while it is running.
+"""
+from __future__ import annotations
+
+import os
+from typing import Iterator, Optional
+
+import numpy as np
+
+from scripts.local_worker import Address, WorkerClient, connect, default_address, serve
+
+WORKER_ADDRESS: Address = default_address("xtts", 8765)
+
+
+class TTSWorkerClient:
+    """Client with the same `synthesize`/`sample_rate`/`model_id` surface as XTTSEngine."""
+
+    def __init__(self, client: WorkerClient, model_id: str, sample_rate: int):
+        self._client = client
+        self.model_id = model_id  # fingerprint of the model the worker has loaded
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text: str, speaker_wav: str, language: str) -> np.ndarray:
+        # The worker may run from another cwd, so always send absolute paths.
+        header, payload = self._client.request(
+            {
+                "op": "synthesize",
+                "text": text,
+                "speaker_wav": os.path.abspath(speaker_wav),
+                "language": language,
+            }
+        )
+        return np.frombuffer(payload, dtype=np.float32)
+
+    def stream(self, text: str, speaker_wav: str, language: str) -> Iterator[np.ndarray]:
+        """Yield pieces of one line as the worker streams them."""
+        request = {
+            "op": "stream",
+            "text": text,
+            "speaker_wav": os.path.abspath(speaker_wav),
+            "language": language,
+        }
+        for header, payload in self._client.stream(request):
+            if payload:
+                yield np.frombuffer(payload, dtype=np.float32)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def connect_worker(address: Address = WORKER_ADDRESS) -> Optional[TTSWorkerClient]:
+    """Return a client for a running worker, or None if none is reachable."""
+    client = connect(address)
+    if client is None:
+        return None
+    return TTSWorkerClient(client, client.info["model_id"], int(client.info["sample_rate"]))
+
+
+def serve_forever(model_path: Optional[str] = None, gpu: bool = False, address: Address = WORKER_ADDRESS):
+    """Load the model once and answer synthesis requests until interrupted."""
+    from scripts.text_to_speech import MODEL_PATH, XTTSEngine, load_tts
+
+    model_path = model_path or MODEL_PATH
+    tts = XTTSEngine(load_tts(model_path, gpu=gpu), model_path)
+
+    def handle(header: dict, payload: bytes):
+        op = header.get("op")
+        if op == "ping":
+            yield {
+                "ok": True,
+                "model_path": model_path,
+                "model_id": tts.model_id,
+                "sample_rate": tts.sample_rate,
+            }, b""
+        elif op == "synthesize":
+            wav = tts.synthesize(header["text"], header["speaker_wav"], header.get("language", "en"))
+            yield {"ok": True, "sample_rate": tts.sample_rate}, wav.astype("<f4").tobytes()
+        elif op == "stream":
+            for piece in tts.stream(header["text"], header["speaker_wav"], header.get("language", "en")):
+                yield {"ok": True, "sample_rate": tts.sample_rate}, piece.astype("<f4").tobytes()
+        else:
+            raise ValueError(f"Unknown op: {op!r}")
+
+    serve(address, handle)
+
+
+if __name__ == "__main__":
+    serve_forever()
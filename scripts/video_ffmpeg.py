@@ -0,0 +1,177 @@
+# scripts/video_ffmpeg.py
+"""
+ffmpeg-native slideshow backend for build_video.
+
+The Timeline planned by scripts.build_video.plan_timeline() (same images,
+frame-quantized durations, crossfade and global fades as the MoviePy path)
+becomes a single filtergraph that ffmpeg runs in one process:
+
+    per slide:  decode once → cover-fit scale → centre crop to the canvas
+                (× supersample) → optional tone LUT → zoompan with the same
+                ease-in-out cubic zoom curve, one output frame per timeline frame
+    chain:      xfade (fade) at each slide's start, or concat for hard cuts
+    global:     fade in / fade out, clone-pad or trim to the audio length,
+                then (draft profiles) drop to the output frame rate
+
+zoompan crops at integer offsets, so the crop is taken from a supersampled
+canvas (SlideshowParams.supersample) to keep the motion smooth. No frame
+passes through Python.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+from scripts.build_video import (
+    PathLike,
+    SlideshowParams,
+    Timeline,
+    _ffmpeg_color_params,
+    zoom_end,
+)
+
+SCALE_FLAGS = {"nearest": "neighbor", "bilinear": "bilinear", "bicubic": "bicubic", "lanczos": "lanczos"}
+
+
+def _fmt(x: float) -> str:
+    return f"{x:.6f}".rstrip("0").rstrip(".")
+
+
+def _cover_size(img_path: Path, p: SlideshowParams, k: int) -> Tuple[int, int]:
+    """Cover-fit size (same scale as _make_clip, incl. overscan) at k× the canvas."""
+    with Image.open(img_path) as im:  # header only, no decode
+        w, h = im.size
+    scale = max(p.target_w / w, p.target_h / h) * p.overscan * k
+    return max(p.target_w * k, round(w * scale)), max(p.target_h * k, round(h * scale))
+
+
+def _zoom_expr(duration: float, idx: int, p: SlideshowParams) -> str:
+    """zoom(on) as an ffmpeg expression: scripts.build_video.zoom_at on frame times."""
+    z0, z1 = p.zoom_start, zoom_end(idx, p)
+    prog = f"st(0,clip(on/{_fmt(duration * p.fps)},0,1))"
+    ease = "if(lt(ld(0),0.5),4*pow(ld(0),3),1-pow(2-2*ld(0),3)/2)"
+    return f"{prog};{_fmt(z0)}+{_fmt(z1 - z0)}*{ease}"
+
+
+def _tone_filter(p: SlideshowParams) -> str:
+    """Same per-channel curve as vfx.LumContrast (threshold 128), as a LUT."""
+    c, lum = p.contrast, p.lum
+    v = f"clip(val+{_fmt(lum)}+{_fmt(c)}*(val-128),0,255)"
+    return f"lutrgb=r='{v}':g='{v}':b='{v}'"
+
+
+def build_filtergraph(
+    timeline: Timeline, p: SlideshowParams, out_fps: Optional[int] = None, vf: Optional[str] = None
+) -> str:
+    """
+    Filtergraph for inputs 0..n-1 (one per slide); output pad is [vout].
+    out_fps: keep every (timeline.fps / out_fps)-th frame (draft renders).
+    vf: extra filter chain on the finished video (e.g. burned-in subtitles).
+    """
+    k = max(1, int(p.supersample))
+    W, H = p.target_w, p.target_h
+    tone = (p.lum != 0.0) or (abs(p.contrast - 1.0) > 1e-6)
+
+    chains: List[str] = []
+    for i, s in enumerate(timeline.slides):
+        cw, ch = _cover_size(s.path, p, k)
+        frames = int(round(s.duration * timeline.fps))
+        steps = [
+            "format=rgb24",
+            f"scale={cw}:{ch}:flags={SCALE_FLAGS[p.cover_resample]}",
+            f"crop={W * k}:{H * k}",
+        ]
+        if tone:
+            steps.append(_tone_filter(p))
+        steps += [
+            f"zoompan=z='{_zoom_expr(s.duration, s.index, p)}'"
+            f":x='iw/2-iw/zoom/2':y='ih/2-ih/zoom/2'"
+            f":d={frames}:s={W}x{H}:fps={timeline.fps}",
+            "setsar=1",
+        ]
+        chains.append(f"[{i}:v]{','.join(steps)}[v{i}]")
+
+    n = len(timeline.slides)
+    if n == 1:
+        last = "v0"
+    elif timeline.xfade > 0:
+        last = "v0"
+        for i in range(1, n):
+            out = f"x{i}"
+            chains.append(
+                f"[{last}][v{i}]xfade=transition=fade:duration={_fmt(timeline.xfade)}"
+                f":offset={_fmt(timeline.slides[i].start)}[{out}]"
+            )
+            last = out
+    else:
+        chains.append("".join(f"[v{i}]" for i in range(n)) + f"concat=n={n}:v=1:a=0[cat]")
+        last = "cat"
+
+    tail: List[str] = []
+    if timeline.fade_in > 0:
+        tail.append(f"fade=t=in:st=0:d={_fmt(timeline.fade_in)}")
+    if timeline.fade_out > 0:
+        st = timeline.video_end - timeline.fade_out
+        tail.append(f"fade=t=out:st={_fmt(st)}:d={_fmt(timeline.fade_out)}")
+    if timeline.duration > timeline.video_end:
+        tail.append(f"tpad=stop_mode=clone:stop_duration={_fmt(timeline.duration - timeline.video_end)}")
+    tail.append(f"trim=end_frame={timeline.frame_count}")
+    if out_fps and out_fps != timeline.fps:
+        tail.append(f"fps={out_fps}")  # samples timeline frames exactly (out_fps divides fps)
+    if vf:
+        tail.append(vf)
+    tail.append("format=rgb24")
+    chains.append(f"[{last}]{','.join(tail)}[vout]")
+    return ";\n".join(chains)
+
+
+def render_ffmpeg(
+    timeline: Timeline,
+    audio_path: PathLike,
+    out_path: PathLike,
+    p: SlideshowParams,
+    preset: str = "medium",
+    bitrate: str = "8000k",
+    loglevel: str = "error",
+    vf: Optional[str] = None,
+    out_fps: Optional[int] = None,
+) -> Path:
+    """Render the timeline + audio to out_path with one ffmpeg invocation."""
+    out_path = Path(out_path)
+    out_fps = out_fps or timeline.fps
+    graph = build_filtergraph(timeline, p, out_fps, vf)
+
+    cmd = ["ffmpeg", "-hide_banner", "-y", "-loglevel", loglevel]
+    for s in timeline.slides:
+        cmd += ["-i", str(s.path)]
+    audio_idx = len(timeline.slides)
+    cmd += ["-i", str(audio_path)]
+
+    # Graph goes in a file: long slideshows overflow the Windows command line.
+    fd, script = tempfile.mkstemp(prefix="slideshow_", suffix=".txt")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(graph)
+        cmd += [
+            "-filter_complex_script", script,
+            "-map", "[vout]",
+            "-map", f"{audio_idx}:a",
+            "-r", str(out_fps),
+            "-c:v", "libx264",
+            "-preset", preset,
+            "-b:v", bitrate,
+            *_ffmpeg_color_params(p),
+            "-c:a", "aac",
+            "-t", _fmt(timeline.duration),
+            str(out_path),
+        ]
+        print(f"🎞️ ffmpeg backend: {len(timeline.slides)} slides, {timeline.duration:.2f}s @ {out_fps} fps")
+        subprocess.run(cmd, check=True)
+    finally:
+        os.unlink(script)
+    return out_path
@@ -0,0 +1,233 @@
+# scripts/video_parallel.py
+"""
+Segment-parallel slideshow rendering.
+
+Frame generation (scripts/kenburns.py) is single-threaded Python, so one
+render keeps one core busy. Here the Timeline is cut at slide boundaries into
+contiguous frame ranges; each range is generated and x264-encoded by its own
+worker process (raw RGB piped into ffmpeg). Every crossfade is rendered by the
+segment on its left (cuts fall where the incoming slide is fully visible).
+All segments share one encoder configuration with a fixed GOP, each starts on
+an IDR frame, and ffmpeg's concat demuxer joins them with stream copy; the
+mix audio is encoded once in that final step. Segments are MPEG-TS, not MP4:
+x264's B-frames give an MP4 an edit list and negative DTS, which the concat
+demuxer can turn into timestamp jumps at every join. check_timestamps()
+(ffprobe) verifies a joined file.
+
+Workers are spawned, so they re-import the entry module: call render_parallel
+from behind an `if __name__ == "__main__":` guard, as main.py does.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from scripts.build_video import PathLike, SlideshowParams, Timeline, _ffmpeg_color_params
+
+GOP_SECONDS = 2.0  # fixed keyframe interval, identical in every segment
+
+
+@dataclass
+class SegmentResult:
+    index: int
+    pid: int
+    frames: int
+    render_s: float
+
+
+def split_segments(timeline: Timeline, parts: int, align: int = 1) -> List[Tuple[int, int]]:
+    """
+    Frame ranges [start, stop) covering the timeline, cut only where a slide
+    has finished fading in (rounded up to a multiple of `align`, the output
+    frame step), sized as evenly as those cut points allow.
+    """
+    fps = timeline.fps
+    total = timeline.frame_count
+    xfade_frames = int(round(timeline.xfade * fps))
+    cuts = sorted(
+        {-(-(int(round(s.start * fps)) + xfade_frames) // align) * align for s in timeline.slides[1:]}
+        & set(range(1, total))
+    )
+    chosen: List[int] = []
+    for k in range(1, max(1, parts)):
+        if not cuts:
+            break
+        target = k * total / parts
+        best = min(cuts, key=lambda c: abs(c - target))
+        if best not in chosen and (not chosen or best > chosen[-1]):
+            chosen.append(best)
+    bounds = [0, *chosen, total]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def encoder_args(
+    p: SlideshowParams, fps: int, preset: str, bitrate: str, threads: int
+) -> List[str]:
+    """x264 settings shared by every segment so they can be stream-copied together."""
+    gop = max(1, int(round(GOP_SECONDS * fps)))
+    return [
+        "-c:v", "libx264",
+        "-preset", preset,
+        "-b:v", bitrate,
+        "-g", str(gop),
+        "-keyint_min", str(gop),
+        "-sc_threshold", "0",
+        "-threads", str(threads),
+        *_ffmpeg_color_params(p),
+    ]
+
+
+def _segment_vf(vf: Optional[str], offset_s: float) -> List[str]:
+    """Run `vf` on the segment's timeline position (subtitles are timed globally)."""
+    if not vf:
+        return []
+    return ["-vf", f"setpts=PTS+{offset_s:.6f}/TB,{vf},setpts=PTS-STARTPTS"]
+
+
+def _render_segment(
+    index: int,
+    timeline: Timeline,
+    p: SlideshowParams,
+    frame_range: Tuple[int, int],
+    out_path: str,
+    preset: str,
+    bitrate: str,
+    threads: int,
+    vf: Optional[str] = None,
+    step: int = 1,
+) -> SegmentResult:
+    from scripts.kenburns import KenBurnsSource
+
+    start = time.perf_counter()
+    source = KenBurnsSource(timeline, p)
+    cmd = [
+        "ffmpeg", "-hide_banner", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{p.target_w}x{p.target_h}", "-r", str(timeline.fps // step),
+        "-i", "-",
+        "-an",
+        *_segment_vf(vf, frame_range[0] / timeline.fps),
+        *encoder_args(p, timeline.fps // step, preset, bitrate, threads),
+        "-f", "mpegts",
+        out_path,
+    ]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    try:
+        frames = 0
+        for frame in source.iter_frames(*frame_range, step):
+            proc.stdin.write(frame.data)
+            frames += 1
+    finally:
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, "ffmpeg")
+    return SegmentResult(index, os.getpid(), frames, time.perf_counter() - start)
+
+
+def concat_segments(
+    segment_paths: List[Path], audio_path: PathLike, out_path: Path, duration: float
+) -> None:
+    """Join segments without re-encoding video; encode the audio once."""
+    list_file = out_path.with_name(f"{out_path.stem}.segments.txt")
+    list_file.write_text(
+        "".join(f"file '{seg.resolve().as_posix()}'\n" for seg in segment_paths), encoding="utf-8"
+    )
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-y", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", str(list_file),
+                "-i", str(audio_path),
+                "-map", "0:v", "-map", "1:a",
+                "-c:v", "copy",
+                "-c:a", "aac",
+                "-avoid_negative_ts", "make_zero",
+                "-t", f"{duration:.6f}",
+                "-movflags", "+faststart",
+                str(out_path),
+            ],
+            check=True,
+        )
+    finally:
+        list_file.unlink(missing_ok=True)
+
+
+def check_timestamps(path: PathLike, fps: float) -> List[str]:
+    """
+    ffprobe the video stream of `path` for join artifacts: DTS that does not
+    increase, or PTS steps other than one frame. Returns the problems found.
+    """
+    out = subprocess.run(
+        [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,dts_time", "-of", "csv=p=0", str(path),
+        ],
+        check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout
+    packets = [tuple(float(v) for v in line.split(",")[:2]) for line in out.split() if "N/A" not in line]
+    problems = []
+    dts = [d for _, d in packets]
+    for i in range(1, len(dts)):
+        if dts[i] <= dts[i - 1]:
+            problems.append(f"DTS does not increase at packet {i}: {dts[i - 1]:.4f} → {dts[i]:.4f}")
+    pts = sorted(p for p, _ in packets)
+    frame = 1.0 / fps
+    for i in range(1, len(pts)):
+        if abs(pts[i] - pts[i - 1] - frame) > frame / 2:
+            problems.append(f"PTS jump at {pts[i - 1]:.4f}s: {pts[i] - pts[i - 1]:.4f}s instead of {frame:.4f}s")
+    return problems
+
+
+def render_parallel(
+    timeline: Timeline,
+    audio_path: PathLike,
+    out_path: PathLike,
+    p: SlideshowParams,
+    workers: int,
+    preset: str = "medium",
+    bitrate: str = "8000k",
+    vf: Optional[str] = None,
+    out_fps: Optional[int] = None,
+) -> Path:
+    """
+    Render the timeline in `workers` processes and concatenate to out_path.
+    vf: extra filter chain applied per segment at its global time (e.g. subtitles).
+    out_fps: output frame rate dividing timeline.fps (draft renders).
+    """
+    out_path = Path(out_path)
+    step = timeline.fps // (out_fps or timeline.fps)
+    ranges = split_segments(timeline, workers, align=step)
+    workers = max(1, min(workers, len(ranges)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    seg_dir = out_path.with_name(f".{out_path.stem}_segments")
+    seg_dir.mkdir(parents=True, exist_ok=True)
+    seg_paths = [seg_dir / f"seg_{i:03d}.ts" for i in range(len(ranges))]
+
+    n_out = -(-timeline.frame_count // step)
+    print(f"🧵 Rendering {n_out} frames as {len(ranges)} segments on {workers} processes")
+    start = time.perf_counter()
+    try:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(
+                    _render_segment, i, timeline, p, r, str(path), preset, bitrate, threads, vf, step
+                )
+                for i, (r, path) in enumerate(zip(ranges, seg_paths))
+            ]
+            for fut in futures:
+                r = fut.result()
+                print(f"   ✅ segment {r.index}: {r.frames} frames in {r.render_s:.1f}s ({r.frames / max(r.render_s, 1e-6):.1f} fps, pid {r.pid})")
+        concat_segments(seg_paths, audio_path, out_path, timeline.duration)
+    finally:
+        shutil.rmtree(seg_dir, ignore_errors=True)
+    wall = time.perf_counter() - start
+    print(f"   ⏱️ wall: {wall:.1f}s ({n_out / max(wall, 1e-6):.1f} fps)")
+    return out_path